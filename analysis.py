@@ -1,5 +1,9 @@
+import sys
+from collections import OrderedDict
 from scipy.sparse import linalg
+from scipy import signal
 import scipy.sparse as sps
+import scipy.linalg
 import numpy as np
 import scipy as sp
 import model
@@ -8,7 +12,10 @@ import model
 class Static:
 
     """
-    Class for linear static analysis.
+    Class for linear static analysis. The free-free partition of the 
+    stiffness matrix is factorized once, using a sparse LU decomposition 
+    with a fill-reducing ordering, and the factorization is reused for all 
+    subsequent right-hand sides.
 
     Parameters
     ----------
@@ -17,34 +24,88 @@ class Static:
 
     Methods
     -------
+    factorize()
+        Assemble and factorize the stiffness matrix.
+    solve(forces)
+        Solve for a batch of nodal force vectors.
     submit()
         Submit analysis.
     """
 
     def __init__(self, model):
         self.model = model
+        self.factorization = None
 
-    def submit(self):
 
-        self.stiffness = model.Stiffness(self.model)
+    def factorize(self):
+
+        """
+        Assemble the stiffness matrix and compute the sparse LU factorization
+        of its free-free partition. The factorization is cached and reused
+        by subsequent calls to solve, until factorize is called again.
+        """
+
+        self.stiffness, = model.assemble(self.model, 'stiffness')
 
         Kff = self.stiffness.getPartitionFF()
+        self.factorization = linalg.splu(Kff, permc_spec='MMD_AT_PLUS_A',
+                diag_pivot_thresh=0, options={'SymmetricMode': True})
+
+
+    def solve(self, forces):
+
+        """
+        Solve for a batch of nodal force vectors, with zero displacements at
+        the restrained degrees of freedom.
+
+        Parameters
+        ----------
+        forces: ndarray
+            The nodal forces (n x k) at all degrees of freedom of the model,
+            where n is the number of degrees of freedom and k the number of 
+            right-hand sides. A one-dimensional array is treated as a single
+            right-hand side.
+
+        Returns
+        -------
+        displacement: ndarray
+            The nodal displacements (n x k).
+        """
+
+        if self.factorization is None:
+            self.factorize()
+
+        fdof, rdof, permutation = self.model.getPartition()
+
+        forces = np.asarray(forces, dtype=float)
+        forces = forces.reshape((forces.shape[0], -1))
+
         Kfr = self.stiffness.getPartitionFR()
-        Krf = self.stiffness.getPartitionRF()
-        Krr = self.stiffness.getPartitionRR()
+        Ur = np.zeros((len(rdof), forces.shape[1]))
+        Uf = self.factorization.solve(forces[fdof]-Kfr.dot(Ur))
+
+        displacement = np.zeros(forces.shape)
+        displacement[rdof] = Ur
+        displacement[fdof] = Uf
 
-        ndof = list(self.model.ndof.values())
-        fdof = list(self.model.fdof.values())
-        rdof = list(self.model.rdof.values())
+        return displacement
 
-        loads = np.array([load[1] for load in self.model.loads])
-        Ff = self.model.Sp.dot(loads)
-        Ur = np.zeros(len(rdof))
-        Uf = sps.linalg.inv(Kff).dot(Ff-Kfr.dot(Ur))
 
-        self.displacement = np.zeros((len(ndof), 1))
-        self.displacement[rdof, 0] = Ur
-        self.displacement[fdof, 0] = Uf
+    def submit(self):
+
+        """
+        Submit analysis. The load values of the model may be scalars or 
+        arrays of length k, in which case k load cases are solved at once
+        and the displacement has k columns.
+        """
+
+        ldof = self.model.getLoadDegreesOfFreedom()
+
+        loads = np.array([np.atleast_1d(load[1]) for load in self.model.loads])
+        forces = np.zeros((len(self.model.ndof), loads.shape[1]))
+        np.add.at(forces, ldof, loads)
+
+        self.displacement = self.solve(forces)
 
 
 
@@ -71,6 +132,27 @@ class Modal:
         The mode shapes normalization method.
     returnShapes
         Flag for returning the mode shapes.
+    cache: OrderedDict
+        The eigenvalues, mass-normalized eigenvectors and system matrices of
+        the models already analysed, keyed by the model key, the sigma value
+        and the tolerance. At most cacheSize entries are retained and an 
+        entry serves any analysis extracting at most as many eigenvalues.
+    statistics: dict
+        The number of cache hits and misses, under the keys 'Hits' and 
+        'Misses'.
+    eigenSolver
+        The eigenvalue solver.
+    iterations
+        The number of LOBPCG iterations of the last solution, or None if 
+        solved by eigsh.
+    previous: tuple
+        The sparsity pattern, the free degrees of freedom and the mass-
+        normalized eigenvectors of the last analysis, from which LOBPCG 
+        starts.
+    nominal: tuple
+        The sparsity pattern, the free degrees of freedom, the sparse LU
+        factorization of the scaled nominal stiffness matrix, by which LOBPCG
+        is preconditioned, and the diagonal scaling.
 
     Methods
     -------
@@ -84,10 +166,24 @@ class Modal:
         Specify the mode shape normalization method.
     setReturnModeShapes(value)
         Specify if mode shapes are returned in addition to eigenvalues.
+    setEigenSolver(solver, iterations, tolerance)
+        Specify the eigenvalue solver.
+    getWarmSolution(stiffness, mass)
+        Solve the eigenvalue problem by LOBPCG from the last analysis.
+    getCached()
+        Get the cached eigen-solution of the model.
+    setCached(values, vectors)
+        Cache the eigen-solution of the model.
     submit()
         Submit analysis.
     """
 
+    cache = OrderedDict()
+    cacheSize = 4
+    statistics = {'Hits': 0, 'Misses': 0}
+    previous = None
+    nominal = None
+
     def __init__(self, model):
 
         self.model = model
@@ -96,6 +192,10 @@ class Modal:
         self.numberOfEigenvalues = 1
         self.normalizationMethod = 'Mass'
         self.returnModeShapes = True
+        self.eigenSolver = 'Lanczos'
+        self.maximumIterations = 50
+        self.solverTolerance = 1e-6
+        self.iterations = None
 
 
     def setSigmaValue(self, sigma):
@@ -203,29 +303,248 @@ class Modal:
         self.returnModeShapes = value
 
 
+    def setEigenSolver(self, solver, iterations=50, tolerance=1e-6):
+
+        """
+        Specify the eigenvalue solver. LOBPCG suits sequences of analyses of
+        slightly different models with the same degrees of freedom, e.g., 
+        along a temperature sweep, as it starts from the mode shapes of the
+        previous analysis and is preconditioned by the factorization of the
+        stiffness matrix of a nominal model, which is computed once. It 
+        falls back to eigsh for the first analysis, for a non-zero sigma 
+        value and when it does not converge.
+
+        Parameters
+        ----------
+        solver: {'Lanczos', 'LOBPCG'}
+            The solver, i.e., the implicitly restarted Lanczos method of 
+            eigsh in shift-invert mode or LOBPCG.
+        iterations: int, positive
+            The maximum number of LOBPCG iterations.
+        tolerance: float, positive
+            The relative residual norm at which LOBPCG is converged.
+
+        Raises
+        ------
+        TypeError
+            If an invalid solver or a non-positive number of iterations is
+            specified.
+        """
+
+        if solver.lower() not in ['lanczos', 'lobpcg']:
+            error = 'Eigenvalue solver must be either "{}" or "{}".'
+            raise TypeError(error.format('Lanczos', 'LOBPCG'))
+
+        if iterations <= 0:
+            raise TypeError('Number of iterations must be positive.')
+
+        self.eigenSolver = 'LOBPCG' if solver.lower() == 'lobpcg' else 'Lanczos'
+        self.maximumIterations = iterations
+        self.solverTolerance = tolerance
+
+
+    def getWarmSolution(self, stiffness, mass):
+
+        """
+        Solve the eigenvalue problem by LOBPCG, starting from the mode shapes
+        of the previous analysis, if of a model with the same degrees of 
+        freedom, and preconditioned by the factorization of the nominal 
+        stiffness matrix, computed from the current one if not available.
+        The problem is scaled symmetrically by the diagonal of the nominal
+        stiffness matrix, so that the residuals are not dominated by the
+        degrees of freedom of stiff supports.
+
+        Parameters
+        ----------
+        stiffness: csc_matrix
+            The free-free partition of the stiffness matrix.
+        mass: csc_matrix
+            The free-free partition of the mass matrix.
+
+        Returns
+        -------
+        solution: tuple or None
+            The eigenvalues and the eigenvectors, or None if no previous 
+            analysis applies or LOBPCG does not converge.
+        """
+
+        fdof, rdof, permutation = self.model.getPartition()
+        pattern = self.model.getPattern()
+
+        def isCompatible(item):
+            return item is not None and item[0] is pattern and \
+                    np.array_equal(item[1], fdof)
+
+        if self.sigma != 0 or not isCompatible(Modal.previous):
+            return None
+
+        if not isCompatible(Modal.nominal):
+            scaling = 1/np.sqrt(stiffness.diagonal())
+            nominal = sps.diags(scaling).dot(stiffness).dot(sps.diags(scaling))
+
+            factorization = linalg.splu(nominal.tocsc(), permc_spec='MMD_AT_PLUS_A',
+                    diag_pivot_thresh=0, options={'SymmetricMode': True})
+            Modal.nominal = (pattern, fdof, factorization, scaling)
+
+        factorization, scaling = Modal.nominal[2:]
+
+        stiffness = sps.diags(scaling).dot(stiffness).dot(sps.diags(scaling))
+        mass = sps.diags(scaling).dot(mass).dot(sps.diags(scaling))
+
+        preconditioner = linalg.LinearOperator(stiffness.shape, dtype=float,
+                matvec=factorization.solve, matmat=factorization.solve)
+
+        # Start from the previous mode shapes, completed by random vectors
+        # if fewer modes were extracted
+
+        k = self.numberOfEigenvalues
+        vectors = Modal.previous[2][:, :k]
+
+        if vectors.shape[1] < k:
+            generator = np.random.RandomState(0)
+            guess = generator.standard_normal((len(fdof), k-vectors.shape[1]))
+            vectors = np.hstack((vectors, guess))
+
+        vectors = vectors/scaling[:, None]
+        vectors = vectors/np.sqrt(np.sum(vectors*mass.dot(vectors), 0))
+
+        # The residual norms are relative to the smallest norm of K*x at
+        # convergence, estimated by the Rayleigh quotients of the start
+        # vectors, which are not affected by their residuals. LOBPCG and the
+        # check of its solution share the same absolute tolerance.
+
+        quotients = np.sum(vectors*stiffness.dot(vectors), 0)
+        scale = np.min(np.abs(quotients)*np.linalg.norm(mass.dot(vectors), axis=0))
+        tolerance = self.solverTolerance*scale
+
+        values, vectors, residuals = linalg.lobpcg(stiffness, vectors, B=mass,
+                M=preconditioner, tol=tolerance, maxiter=self.maximumIterations,
+                largest=False, retResidualNormsHistory=True)
+
+        self.iterations = len(residuals)
+
+        residual = stiffness.dot(vectors)-mass.dot(vectors)*values
+
+        if not np.all(np.linalg.norm(residual, axis=0) <= tolerance):
+            warning = 'LOBPCG not converged in {} iterations, solved by eigsh.\n'
+            sys.stdout.write(warning.format(self.iterations))
+
+            self.iterations = None
+            return None
+
+        return values, vectors*scaling[:, None]
+
+
+    def getCached(self):
+
+        """
+        Get the eigen-solution of the model from the cache, if the model has
+        a key and at least as many eigenvalues were extracted for it. Cache
+        hits and misses are counted in statistics.
+
+        Returns
+        -------
+        solution: tuple or None
+            The eigenvalues, the mass-normalized eigenvectors and the full 
+            stiffness and mass matrices, or None if not cached.
+        """
+
+        if self.model.key is None:
+            return None
+
+        key = (self.model.key, self.sigma, self.tolerance)
+        entry = self.cache.get(key)
+
+        if entry is None or len(entry[0]) < self.numberOfEigenvalues:
+            Modal.statistics['Misses'] += 1
+            return None
+
+        self.cache.move_to_end(key)
+        Modal.statistics['Hits'] += 1
+
+        # Select the eigenvalues nearest to sigma, as extracted by eigsh
+
+        values, vectors, stiffness, mass = entry
+        index = np.argsort(np.abs(values-self.sigma), kind='stable')
+        index = np.sort(index[:self.numberOfEigenvalues])
+
+        return values[index], vectors[:, index], stiffness, mass
+
+
+    def setCached(self, values, vectors):
+
+        """
+        Cache the eigen-solution of the model, if the model has a key, 
+        discarding the least recently used entries beyond cacheSize.
+
+        Parameters
+        ----------
+        values: ndarray
+            The eigenvalues in ascending order.
+        vectors: ndarray
+            The mass-normalized eigenvectors at the free degrees of freedom.
+        """
+
+        if self.model.key is None:
+            return
+
+        key = (self.model.key, self.sigma, self.tolerance)
+        self.cache[key] = (values, vectors, self.stiffness.full, self.mass.full)
+        self.cache.move_to_end(key)
+
+        while len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
+
+
     def submit(self):
 
-        stiffness = model.Stiffness(self.model).getPartitionFF()
-        mass = model.Mass(self.model).getPartitionFF()
+        solution = self.getCached()
+        self.iterations = None
 
-        values = linalg.eigsh(stiffness, k=self.numberOfEigenvalues,
-                M=mass, sigma=self.sigma, tol=self.tolerance,
-                return_eigenvectors=self.returnModeShapes)
+        if solution is None:
+            self.stiffness, self.mass = model.assemble(self.model, 'stiffness', 'mass')
+            stiffness = self.stiffness.getPartitionFF()
+            mass = self.mass.getPartitionFF()
 
-        if self.returnModeShapes:
-            values, vectors = values[0], values[1]
+            if self.eigenSolver == 'LOBPCG' and self.returnModeShapes:
+                solution = self.getWarmSolution(stiffness, mass)
 
+            if solution is None:
+                values = linalg.eigsh(stiffness, k=self.numberOfEigenvalues,
+                        M=mass, sigma=self.sigma, tol=self.tolerance,
+                        return_eigenvectors=self.returnModeShapes)
+            else:
+                values = solution
+
+            if self.returnModeShapes:
+                values, vectors = values
+                order = np.argsort(values)
+                values, vectors = values[order], vectors[:, order]
+
+                scaling = np.sqrt(np.sum(vectors*mass.dot(vectors), 0))
+                normalized = vectors/scaling
+                self.setCached(values, normalized)
+
+                fdof, rdof, permutation = self.model.getPartition()
+                Modal.previous = (self.model.getPattern(), fdof, normalized)
+        else:
+            values, vectors, stiffness, mass = solution
+
+            self.stiffness = model.Stiffness(self.model, stiffness)
+            self.mass = model.Mass(self.model, mass)
+            mass = self.mass.getPartitionFF()
+
+        if self.returnModeShapes:
             if np.any(values<0):
                 index = np.where(values>=0)
                 values, vectors = values[index[0]], vectors[:, index[0]]
 
                 warning = '{} negative values found.\n'
-                syst.stdout.write(warning.format(str(len(index[0]))))
+                sys.stdout.write(warning.format(str(len(index[0]))))
 
             if self.normalizationMethod == 'Mass':
-                for vector in vectors.T:
-                    scaling = np.sqrt(vector.dot(mass.toarray().dot(vector)))
-                    vector /= scaling
+                scaling = np.sqrt(np.sum(vectors*mass.dot(vectors), 0))
+                vectors /= scaling
             else:
                 scaling = np.max(np.abs(vectors), 0)
                 vectors /= scaling
@@ -233,8 +552,9 @@ class Modal:
             # check if vectors has more than one columns.
             # If not, vectors.shape[1] will raise an error
             self.modes = np.zeros((len(self.model.ndof), vectors.shape[1]))
-            self.modes[list(self.model.fdof.values()), :] = vectors
-            self.modes[list(self.model.rdof.values()), :] = 0
+            fdof, rdof, permutation = self.model.getPartition()
+            self.modes[fdof, :] = vectors
+            self.modes[rdof, :] = 0
         else:
             self.modes = None
             if np.any(values<0):
@@ -242,7 +562,7 @@ class Modal:
                 values = values[index[0]]
 
                 warning = '{} negative values found.\n'
-                syst.stdout.write(warning.format(str(len(index[0]))))
+                sys.stdout.write(warning.format(str(len(index[0]))))
 
         self.frequencies = np.sqrt(values)/(2*np.pi)
 
@@ -252,19 +572,59 @@ class Dynamics(object):
 
     """
     Class for dynamic analysis, to calculate the time response of a system
-    subjected to dynamic loads, using Newmark scheme.
+    subjected to dynamic loads, using either the Newmark scheme or the exact
+    integration of the decoupled modal equations.
 
     Parameters
     ----------
     model: Model
         The model to be analysed.
 
+    Attributes
+    ----------
+    integrationMethod
+        The time integration method.
+    numberOfModes
+        The number of modes extracted for the modal superposition.
+    frequencyCutoff
+        The frequency above which modes are discarded.
+    participationThreshold
+        The participation ratio at which the modal basis is truncated.
+    participationBasis
+        The basis of the participation ratio.
+
     Methods
     -------
     setTimePeriod(period)
         Specify the simulation time period.
     setIncrementSize(size)
-        Specify the solution time increment.
+        Specify the output time increment.
+    setIntegrationIncrement(size)
+        Specify the integration time increment.
+    setIntegrationMethod(method)
+        Specify the time integration method.
+    setNumberOfModes(number)
+        Specify the number of modes to be extracted.
+    setFrequencyCutoff(frequency)
+        Specify the frequency above which modes are discarded.
+    setParticipationThreshold(ratio, basis, direction)
+        Specify the participation ratio at which modes are truncated.
+    getParticipation(modal)
+        Get the cumulative participation ratio of the modes.
+    getLoads(time)
+        Get the values of the model loads at the given time instants.
+    setEigenSolver(solver, iterations, tolerance)
+        Specify the eigenvalue solver of the modal basis.
+    setBlockSize(size)
+        Specify the number of integration increments per time block.
+    getExactResponse(omega, damping, force, step, initial)
+        Get the modal response by exact integration.
+    getNewmarkResponse(omega, damping, force, step, initial)
+        Get the modal response by the Newmark scheme.
+    initialize()
+        Extract the modal basis and determine the time instants.
+    iterate()
+        Integrate and yield the modal response block by block.
     submit()
         Submit analysis.
     """
@@ -274,6 +634,17 @@ class Dynamics(object):
         self.model = model
         self.timePeriod = 1
         self.incrementSize = 0.1
+        self.integrationIncrement = None
+        self.integrationMethod = 'Newmark'
+        self.numberOfModes = 10
+        self.frequencyCutoff = None
+        self.participationThreshold = None
+        self.participationBasis = 'Load'
+        self.participationDirection = 'y'
+        self.blockSize = None
+        self.eigenSolver = 'Lanczos'
+        self.maximumIterations = 50
+        self.solverTolerance = 1e-6
 
 
     def setTimePeriod(self, period):
@@ -301,7 +672,10 @@ class Dynamics(object):
     def setIncrementSize(self, size):
 
         """
-        Specify the solution increment size.
+        Specify the output increment size, i.e., the interval at which the
+        response is returned. Unless an integration increment is specified,
+        it is also used as the integration increment, reduced to one tenth 
+        of the period of the highest retained mode for the Newmark scheme.
 
         Parameters
         ----------
@@ -320,48 +694,429 @@ class Dynamics(object):
         self.incrementSize = size
 
 
+    def setIntegrationIncrement(self, size):
 
+        """
+        Specify the integration increment size, independently of the output
+        increment size. The response is interpolated at the output time 
+        instants.
 
-    def submit(self):
+        Parameters
+        ----------
+        size: float, positive or None
+            The integration increment size. If None, the increment is 
+            determined from the output increment size.
 
-        modal = Modal(self.model)
-        modal.setNumberOfEigenvalues(10)
-        modal.submit()
+        Raises
+        ------
+        TypeError
+            If the increment size is not positive.
+        """
 
-        frequencies = modal.frequencies
-        modes = modal.modes
+        if size is not None and size <= 0:
+            raise TypeError('Increment size must be positive.')
 
-        beta, gamma = 1/6, 1/2
-        period, step = self.timePeriod, self.incrementSize
+        self.integrationIncrement = size
 
-        if step > 0.1*(1/frequencies[-1]):
-            step = 0.1*(1/frequencies[-1])
 
-        time = np.arange(0, period+step, step)
+    def setNumberOfModes(self, number):
 
+        """
+        Specify the number of modes extracted for the modal superposition.
+        If not specified, 10 modes are extracted.
+
+        Parameters
+        ----------
+        number: int, positive
+            The number of modes.
+
+        Raises
+        ------
+        TypeError
+            If a non-positive number of modes is specified.
+        """
+
+        if number <= 0:
+            raise TypeError('Number of modes must be positive.')
+
+        self.numberOfModes = number
+
+
+    def setFrequencyCutoff(self, frequency):
+
+        """
+        Specify the frequency above which the extracted modes are discarded.
+        At least the first mode is always retained.
+
+        Parameters
+        ----------
+        frequency: float, positive or None
+            The cut-off frequency. If None, no modes are discarded.
+
+        Raises
+        ------
+        TypeError
+            If the cut-off frequency is not positive.
+        """
+
+        if frequency is not None and frequency <= 0:
+            raise TypeError('Cut-off frequency must be positive.')
+
+        self.frequencyCutoff = frequency
+
+
+    def setParticipationThreshold(self, ratio, basis='Load', direction='y'):
+
+        """
+        Specify the participation ratio at which the modal basis is 
+        truncated, i.e., the smallest number of the extracted modes whose
+        cumulative participation reaches the ratio is retained. 
+
+        The load participation is the fraction of the static compliance 
+        f^T K^-1 f captured by the modes, with f the load distribution 
+        weighted by the root-mean-square value of each load history. The
+        mass participation is the fraction of the total mass in the 
+        specified direction captured by the effective modal masses.
+
+        Parameters
+        ----------
+        ratio: float or None
+            The participation ratio, ranging from 0 to 1. If None, the modal 
+            basis is not truncated based on participation.
+        basis: {'Load', 'Mass'}
+            The basis of the participation ratio.
+        direction: {'x', 'y'}
+            The direction of the mass participation.
+
+        Raises
+        ------
+        TypeError
+            If an invalid ratio, basis or direction is specified.
+        """
+
+        if ratio is not None and not 0 < ratio <= 1:
+            raise TypeError('Participation ratio must be in the range (0, 1].')
+
+        if basis.lower() not in ['load', 'mass']:
+            error = 'Participation basis must be either "{}" or "{}".'
+            raise TypeError(error.format('Load', 'Mass'))
+
+        if direction not in ['x', 'y']:
+            error = 'Participation direction must be either "{}" or "{}".'
+            raise TypeError(error.format('x', 'y'))
+
+        self.participationThreshold = ratio
+        self.participationBasis = basis.capitalize()
+        self.participationDirection = direction
 
-        a, b = self.model.alpha, self.model.beta
-        damping = a*1/(4*np.pi*frequencies)+b*np.pi*frequencies
 
-        dsp = np.zeros((len(frequencies), len(time)))
-        vlc = np.zeros((len(frequencies), len(time)))
-        acc = np.zeros((len(frequencies), len(time)))
+    def getParticipation(self, modal):
 
-        K = (np.diag(frequencies)*2*np.pi)**2
-        C = np.diag(frequencies)*2*np.pi*2*damping
-        M = np.eye(len(frequencies))
+        """
+        Get the cumulative participation ratio of the mass-normalized modes
+        of a modal analysis, according to the specified participation basis.
+
+        Parameters
+        ----------
+        modal: Modal
+            The submitted modal analysis.
+
+        Returns
+        -------
+        participation: ndarray
+            The cumulative participation ratio of the modes.
+        """
+
+        fdof, rdof, permutation = self.model.getPartition()
+        mass = modal.mass.getPartitionFF()
+        modes = modal.modes[fdof]
+
+        if self.participationBasis == 'Mass':
+            direction = model.Node.dictionary[self.participationDirection]
+            labels, dofs, numbers = self.model.ndof.getArrays()
+
+            influence = np.zeros((len(self.model.ndof), 1))
+            influence[numbers[dofs == direction]] = 1
+            influence = influence[fdof]
+        else:
+            loads = np.array([np.sqrt(np.mean(np.square(load[1])))
+                    if not callable(load) else 0 for load in self.model.loads], 
+                    dtype=float)
+
+            # Load functions are evaluated block by block at the output 
+            # time instants
+
+            functions = [i for i, load in enumerate(self.model.loads) if callable(load)]
+
+            if functions:
+                time = np.arange(0, self.timePeriod+self.incrementSize, self.incrementSize)
+                size = len(time) if self.blockSize is None else self.blockSize
+
+                for start in range(0, len(time), size):
+                    loads[functions] += np.sum(np.square(
+                            self.getLoads(time[start:start+size])[functions]), 1)
+
+                loads[functions] = np.sqrt(loads[functions]/len(time))
+
+            ldof = self.model.getLoadDegreesOfFreedom()
+
+            influence = np.zeros((len(self.model.ndof), len(loads)))
+            influence[ldof, np.arange(len(loads))] = loads
+            influence = influence[fdof]
+
+        if self.participationBasis == 'Mass':
+            factors = modes.T.dot(mass.dot(influence))
+            total = influence.T.dot(mass.dot(influence))
+        else:
+            stiffness = modal.stiffness.getPartitionFF()
+            omega = 2*np.pi*modal.frequencies[:, np.newaxis]
+            factors = modes.T.dot(influence)/omega
+            total = influence*linalg.splu(stiffness).solve(influence)
+
+        participation = np.cumsum(np.sum(factors**2, 1))/np.sum(total)
+
+        return participation
 
-        #  Construct modal force vector
+
+    def getLoads(self, time):
+
+        """
+        Get the values of the model loads at the given time instants, load
+        functions given as arrays being interpolated and those given as 
+        functions being evaluated, e.g., for the instants of a time block.
+
+        Parameters
+        ----------
+        time: ndarray
+            The time instants (t).
+
+        Returns
+        -------
+        loads: ndarray
+            The load values (l x t), in order of model loads.
+        """
 
         loads = np.zeros((len(self.model.loads), len(time)))
 
         for i, load in enumerate(self.model.loads):
-            loads[i] = np.interp(time, load[0], load[1])
+            if callable(load):
+                loads[i] = load(time)
+            else:
+                loads[i] = np.interp(time, load[0], load[1])
+
+        return loads
+
+
+    def setEigenSolver(self, solver, iterations=50, tolerance=1e-6):
+
+        """
+        Specify the eigenvalue solver of the modal basis, as for modal 
+        analysis.
+
+        Parameters
+        ----------
+        solver: {'Lanczos', 'LOBPCG'}
+            The solver.
+        iterations: int, positive
+            The maximum number of LOBPCG iterations.
+        tolerance: float, positive
+            The relative residual norm at which LOBPCG is converged.
+
+        Raises
+        ------
+        TypeError
+            If an invalid solver or a non-positive number of iterations is
+            specified.
+        """
+
+        if solver.lower() not in ['lanczos', 'lobpcg']:
+            error = 'Eigenvalue solver must be either "{}" or "{}".'
+            raise TypeError(error.format('Lanczos', 'LOBPCG'))
+
+        if iterations <= 0:
+            raise TypeError('Number of iterations must be positive.')
+
+        self.eigenSolver = solver
+        self.maximumIterations = iterations
+        self.solverTolerance = tolerance
+
+
+    def setIntegrationMethod(self, method):
+
+        """
+        Specify the time integration method. The Newmark scheme (linear 
+        acceleration) reduces the increment size to one tenth of the period
+        of the highest mode, while the exact method integrates the modal 
+        equations exactly for loads varying linearly within each increment
+        and uses the specified increment size.
+
+        Parameters
+        ----------
+        method: {'Newmark', 'Exact'}
+            The time integration method.
+
+        Raises
+        ------
+        TypeError
+            If an invalid integration method is specified.
+        """
+
+        if method.lower() not in ['newmark', 'exact']:
+            error = 'Integration method must be either "{}" or "{}".'
+            raise TypeError(error.format('Newmark', 'Exact'))
+
+        self.integrationMethod = method.capitalize()
+
+
+    @staticmethod
+    def getExactResponse(omega, damping, force, step, initial=None):
+
+        """
+        Get the response of mass-normalized single degree of freedom systems
+        by exact integration, assuming that the force varies linearly within
+        each increment. The state transition recurrence of each system is 
+        evaluated over the whole time axis as a second-order IIR filter, 
+        whose initial conditions are computed for all systems at once.
+
+        Parameters
+        ----------
+        omega: ndarray
+            The circular natural frequencies (m), where m is the number of
+            systems.
+        damping: ndarray
+            The damping ratios (m).
+        force: ndarray
+            The force (m x n) at the time instants, where n is the number of
+            time instants.
+        step: float
+            The time increment.
+        initial: ndarray, optional
+            The displacement and velocity (2 x m) at the first time instant.
+            If not specified, the systems start at rest.
+
+        Returns
+        -------
+        displacement: ndarray
+            The displacement (m x n).
+        velocity: ndarray
+            The velocity (m x n).
+        acceleration: ndarray
+            The acceleration (m x n).
+        """
+
+        m, n = force.shape
+        initial = np.zeros((2, m)) if initial is None else np.asarray(initial)
+
+        # Exponential of the state matrix augmented by a linear force, in
+        # which the last two states carry the force and its increment.
+
+        augmented = np.zeros((m, 4, 4))
+        augmented[:, 0, 1] = 1
+        augmented[:, 1, 0] = -omega**2
+        augmented[:, 1, 1] = -2*damping*omega
+        augmented[:, 1, 2] = 1
+        augmented[:, 2, 3] = 1/step
+
+        exponential = scipy.linalg.expm(augmented*step)
+        A = exponential[:, :2, :2]
+        G1 = exponential[:, :2, 3]
+        G0 = exponential[:, :2, 2]-G1
+
+        adjoint = np.zeros((m, 2, 2))
+        adjoint[:, 0, 0] = -A[:, 1, 1]
+        adjoint[:, 0, 1] = A[:, 0, 1]
+        adjoint[:, 1, 0] = A[:, 1, 0]
+        adjoint[:, 1, 1] = -A[:, 0, 0]
+
+        trace = A[:, 0, 0]+A[:, 1, 1]
+        determinant = A[:, 0, 0]*A[:, 1, 1]-A[:, 0, 1]*A[:, 1, 0]
+
+        B1 = G0+np.matmul(adjoint, G1[:, :, np.newaxis])[:, :, 0]
+        B2 = np.matmul(adjoint, G0[:, :, np.newaxis])[:, :, 0]
+
+        response = np.zeros((2, m, n))
+        response[:, :, 0] = initial
+
+        if n > 1:
+            response[:, :, 1] = np.einsum('mkl,lm->km', A, initial)+\
+                    G0.T*force[:, 0]+G1.T*force[:, 1]
+
+        if n > 2:
+
+            # Initial conditions (m x 2 x 2) of the filters of displacement 
+            # and velocity, from the force and the response at the first 
+            # two time instants, in the direct form of scipy.signal.lfilter
+
+            previous, first = response[:, :, 1].T, response[:, :, 0].T
+            initial = np.stack((
+                    B1*force[:, [1]]+B2*force[:, [0]]+
+                    trace[:, np.newaxis]*previous-determinant[:, np.newaxis]*first,
+                    B2*force[:, [1]]-determinant[:, np.newaxis]*previous), axis=2)
+
+            for j in range(m):
+                a = [1, -trace[j], determinant[j]]
+
+                for k in range(2):
+                    b = [G1[j, k], B1[j, k], B2[j, k]]
+                    response[k, j, 2:] = signal.lfilter(b, a, force[j, 2:], 
+                            zi=initial[j, k])[0]
 
-        frc = modes.T.dot(self.model.Sp).dot(loads)
+        displacement, velocity = response
+        acceleration = force-2*(damping*omega)[:, np.newaxis]*velocity-\
+                       (omega**2)[:, np.newaxis]*displacement
+
+        return displacement, velocity, acceleration
+
+
+    @staticmethod
+    def getNewmarkResponse(omega, damping, force, step, initial=None):
+
+        """
+        Get the response of mass-normalized single degree of freedom systems
+        by the Newmark scheme with linear acceleration.
+
+        Parameters
+        ----------
+        omega: ndarray
+            The circular natural frequencies (m), where m is the number of
+            systems.
+        damping: ndarray
+            The damping ratios (m).
+        force: ndarray
+            The force (m x n) at the time instants, where n is the number of
+            time instants.
+        step: float
+            The time increment.
+        initial: ndarray, optional
+            The displacement and velocity (2 x m) at the first time instant.
+            If not specified, the systems start at rest.
+
+        Returns
+        -------
+        displacement: ndarray
+            The displacement (m x n).
+        velocity: ndarray
+            The velocity (m x n).
+        acceleration: ndarray
+            The acceleration (m x n).
+        """
+
+        beta, gamma = 1/6, 1/2
+        m, n = force.shape
+
+        dsp = np.zeros((m, n))
+        vlc = np.zeros((m, n))
+        acc = np.zeros((m, n))
+
+        if initial is not None:
+            dsp[:, 0], vlc[:, 0] = initial
+
+        K = np.diag(omega)**2
+        C = np.diag(omega)*2*damping
+        M = np.eye(m)
 
         efrc = -C.dot(vlc[:, 0])-K.dot(dsp[:, 0])
-        acc[:, 0] = np.linalg.solve(M, frc[:, 0]+efrc)
+        acc[:, 0] = np.linalg.solve(M, force[:, 0]+efrc)
 
         a1 = 1/(beta*step**2)*M+gamma/(beta*step)*C
         a2 = 1/(beta*step)*M+(gamma/beta-1)*C
@@ -375,18 +1130,173 @@ class Dynamics(object):
         c5 = -1/(beta*step)
         c6 = -(1/(2*beta)-1)
 
-        for j in range(len(time)-1):
+        for j in range(n-1):
 
             efrc = a1.dot(dsp[:, j])+a2.dot(vlc[:, j])+a3.dot(acc[:, j])
-            dsp[:, j+1] = Ki.dot(frc[:, j+1]+efrc)
+            dsp[:, j+1] = Ki.dot(force[:, j+1]+efrc)
 
             vlc[:, j+1] = c1*(dsp[:, j+1]-dsp[:, j])+c2*vlc[:, j]+c3*acc[:, j]
             acc[:, j+1] = c4*(dsp[:, j+1]-dsp[:, j])+c5*vlc[:, j]+c6*acc[:, j]
 
-        self.modes = modes
-        self.frequencies = frequencies
+        return dsp, vlc, acc
+
+
+    def setBlockSize(self, size):
+
+        """
+        Specify the number of integration increments per time block. The
+        response is integrated, and returned by iterate, block by block, so
+        that the memory demand is bounded by the block size rather than by
+        the simulation period.
+
+        Parameters
+        ----------
+        size: int, positive or None
+            The block size. If None, the whole period forms a single block.
+
+        Raises
+        ------
+        TypeError
+            If the block size is not positive.
+        """
+
+        if size is not None and size <= 0:
+            raise TypeError('Block size must be positive.')
+
+        self.blockSize = size
+
+
+    def initialize(self):
+
+        """
+        Extract and truncate the modal basis and determine the integration
+        and output time instants. Called by submit, or before iterate when
+        the response is processed block by block.
+        """
+
+        modal = Modal(self.model)
+        modal.setNumberOfEigenvalues(self.numberOfModes)
+        modal.setEigenSolver(self.eigenSolver, self.maximumIterations, 
+                self.solverTolerance)
+        modal.submit()
+
+        self.iterations = modal.iterations
+
+        #  Truncate modal basis
+
+        retain = len(modal.frequencies)
+
+        if self.frequencyCutoff is not None:
+            retain = max(np.sum(modal.frequencies <= self.frequencyCutoff), 1)
+
+        if self.participationThreshold is not None:
+            self.participation = self.getParticipation(modal)
+            reached = self.participation >= self.participationThreshold
+
+            if np.any(reached):
+                retain = min(retain, np.argmax(reached)+1)
+            else:
+                warning = 'Participation threshold not reached with {} modes.\n'
+                sys.stdout.write(warning.format(len(modal.frequencies)))
+
+        self.frequencies = modal.frequencies[:retain]
+        self.modes = modal.modes[:, :retain]
+
+        period, output = self.timePeriod, self.incrementSize
+
+        if self.integrationIncrement is not None:
+            self.step = self.integrationIncrement
+        elif self.integrationMethod == 'Newmark':
+            self.step = min(output, 0.1*(1/self.frequencies[-1]))
+        else:
+            self.step = output
+
+        self.time = np.arange(0, period+output, output)
+
+
+    def iterate(self):
+
+        """
+        Integrate the modal response block by block, starting from the 
+        state at the end of the previous block, and yield the response of
+        each block at the output time instants. The modal basis must have
+        been extracted by initialize.
+
+        Yields
+        ------
+        time: ndarray
+            The output time instants (t) of the block.
+        displacement: ndarray
+            The modal displacements (m x t).
+        velocity: ndarray
+            The modal velocities (m x t).
+        acceleration: ndarray
+            The modal accelerations (m x t).
+        """
+
+        frequencies, step = self.frequencies, self.step
+        interpolate = step != self.incrementSize
+
+        time = np.arange(0, self.timePeriod+step, step)
+        size = len(time)-1 if self.blockSize is None else self.blockSize
+
+        a, b = self.model.alpha, self.model.beta
+        omega = 2*np.pi*frequencies
+        damping = a*1/(4*np.pi*frequencies)+b*np.pi*frequencies
+
+        ldof = self.model.getLoadDegreesOfFreedom()
+        projection = self.modes[ldof].T
+
+        if self.integrationMethod == 'Exact':
+            integrate = self.getExactResponse
+        else:
+            integrate = self.getNewmarkResponse
+
+        initial, first = None, 0
+
+        for start in range(0, max(len(time)-1, 1), size):
+            end = min(start+size, len(time)-1)
+            btime = time[start:end+1]
+
+            #  Construct modal force vector
+
+            frc = projection.dot(self.getLoads(btime))
+            dsp, vlc, acc = integrate(omega, damping, frc, step, initial)
+            initial = np.array([dsp[:, -1], vlc[:, -1]])
+
+            #  Interpolate response at output time instants, each output 
+            #  instant being returned by a single block
+
+            if end == len(time)-1:
+                last = len(self.time)
+            else:
+                last = np.searchsorted(self.time, btime[-1], side='right')
+
+            otime = self.time[first:last]
+
+            if interpolate:
+                dsp, vlc, acc = [np.array([np.interp(otime, btime, item) 
+                        for item in response]) for response in (dsp, vlc, acc)]
+            else:
+                skip = len(btime)-len(otime)
+                dsp, vlc, acc = dsp[:, skip:], vlc[:, skip:], acc[:, skip:]
+
+            first = last
+
+            yield otime, dsp, vlc, acc
+
+
+    def submit(self):
+
+        """
+        Submit analysis. The modal response over the whole period is stored
+        in the displacement, velocity and acceleration attributes.
+        """
+
+        self.initialize()
+        blocks = list(zip(*self.iterate()))
 
-        self.time = time
-        self.displacement = dsp
-        self.velocity = vlc
-        self.acceleration = acc
+        self.time = np.hstack(blocks[0])
+        self.displacement = np.hstack(blocks[1])
+        self.velocity = np.hstack(blocks[2])
+        self.acceleration = np.hstack(blocks[3])
@@ -0,0 +1,401 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import analysis
+import model
+import front2back
+import main
+
+import time as tm
+import numpy as np
+from scipy.sparse import linalg
+
+
+def getJob(nel_x, nel_y, numbering='Natural'):
+
+    """
+    Get a job of the default beam, i.e., healthy and with nominal material
+    properties, for the specified mesh density.
+
+    Parameters
+    ----------
+    nel_x, nel_y: int
+        The number of elements along the length and the height.
+    numbering: {'Natural', 'RCM'}
+        The numbering of degrees of freedom.
+
+    Returns
+    -------
+    job: front2back.BackendJob
+        The job.
+    """
+
+    job = front2back.BackendJob('Benchmark')
+    job.setMesh(nel_x, nel_y, numbering)
+
+    return job
+
+
+def getModel(nel_x, nel_y, numbering='Natural'):
+
+    """
+    Get the model of the job of getJob, as built by main.getModel for the
+    jobs submitted through main.submit.
+
+    Returns
+    -------
+    model1: Model
+        The model.
+    coordinates: ndarray
+        The node coordinates (n x 2).
+    """
+
+    return main.getModel(getJob(nel_x, nel_y, numbering))
+
+
+def getMeshDensity(size, ratio=200/6):
+
+    """
+    Get the number of elements along the length and the height for a
+    target number of degrees of freedom, at a fixed element aspect ratio.
+
+    Parameters
+    ----------
+    size: int
+        The target number of degrees of freedom.
+    ratio: float
+        The ratio of the number of elements along the length to that along
+        the height.
+
+    Returns
+    -------
+    nel_x, nel_y: int
+        The number of elements along the length and the height.
+    """
+
+    nel_y = max(int(round(np.sqrt(size/2/ratio))), 2)
+    nel_x = int(round(ratio*nel_y))
+
+    return nel_x, nel_y
+
+
+def run(nel_x, nel_y, modes=10, steps=10000, step=0.005):
+
+    """
+    Time the stages of a time-history job, i.e., model setup, assembly,
+    eigenvalue extraction, time integration and output, for one mesh.
+
+    Parameters
+    ----------
+    nel_x, nel_y: int
+        The number of elements along the length and the height.
+    modes: int, positive
+        The number of extracted modes.
+    steps: int, positive
+        The number of time increments.
+    step: float, positive
+        The time increment.
+
+    Returns
+    -------
+    timings: dict
+        The wall time in seconds of each completed stage.
+    """
+
+    timings = {}
+
+    start = tm.perf_counter()
+    model1, coordinates = getModel(nel_x, nel_y)
+    timings['Setup'] = tm.perf_counter()-start
+
+    start = tm.perf_counter()
+    stiffness, mass = model.assemble(model1, 'stiffness', 'mass')
+    Kff, Mff = stiffness.getPartitionFF(), mass.getPartitionFF()
+    timings['Assembly'] = tm.perf_counter()-start
+
+    start = tm.perf_counter()
+    values, vectors = linalg.eigsh(Kff, k=modes, M=Mff, sigma=0)
+    vectors /= np.sqrt(np.sum(vectors*Mff.dot(vectors), 0))
+    timings['Eigen'] = tm.perf_counter()-start
+
+    # Modal response to a harmonic point load at mid-span of the top
+    # fibre, using the exact integrator
+
+    start = tm.perf_counter()
+    length, height = sum(main.spans), main.height
+    tolerance = main.getTolerance(nel_x, nel_y)
+
+    fdof, rdof, permutation = model1.getPartition()
+    plabel = main.findNodes(coordinates, [[length/2, height/2]], tolerance)[0]
+    pdof = np.searchsorted(fdof, model1.mesh.ndof[plabel, 1])
+
+    time = np.arange(steps+1)*step
+    force = vectors[[pdof]].T*1e3*np.sin(2*np.pi*time)
+    omega = np.sqrt(np.abs(values))
+
+    dsp, vlc, acc = analysis.Dynamics.getExactResponse(
+            omega, np.full(modes, 0.02), force, step)
+    timings['Integration'] = tm.perf_counter()-start
+
+    # Project to the output degrees of freedom and write as in main.submit
+
+    start = tm.perf_counter()
+    sections = (np.arange(20)+0.5)*length/20
+    levels = np.array([-1, 0, 1])*height/3
+    points = np.column_stack((np.repeat(sections, 3), np.tile(levels, 20)))
+    olabels = main.findNodes(coordinates, points, tolerance)
+
+    odofs = np.searchsorted(fdof, model1.mesh.ndof[olabels, :2].ravel())
+    displacements = vectors[odofs].dot(dsp).T
+
+    with tempfile.TemporaryDirectory() as folder:
+        fname = os.path.join(folder, 'displacements.dat')
+        np.savetxt(fname, displacements, fmt='% .16e')
+
+    timings['Output'] = tm.perf_counter()-start
+
+    return timings
+
+
+def factorize(nel_x, nel_y, numbering, ordering):
+
+    """
+    Get the fill-in and the wall time of the sparse LU factorization of the
+    free-free stiffness partition.
+
+    Parameters
+    ----------
+    nel_x, nel_y: int
+        The number of elements along the length and the height.
+    numbering: {'Natural', 'RCM'}
+        The numbering of degrees of freedom.
+    ordering: str
+        The column ordering of the factorization, e.g., 'NATURAL', 'COLAMD'
+        (eigsh in shift-invert mode) or 'MMD_AT_PLUS_A' (static analysis).
+
+    Returns
+    -------
+    fill: int
+        The number of non-zero entries of the factors.
+    elapsed: float
+        The wall time in seconds.
+    """
+
+    model1, coordinates = getModel(nel_x, nel_y, numbering)
+    stiffness, = model.assemble(model1, 'stiffness')
+    Kff = stiffness.getPartitionFF()
+
+    start = tm.perf_counter()
+    factorization = linalg.splu(Kff, permc_spec=ordering)
+    elapsed = tm.perf_counter()-start
+
+    return factorization.L.nnz+factorization.U.nnz, elapsed
+
+
+def partition(nel_x, nel_y, method='Permutation'):
+
+    """
+    Get the wall time and the peak memory of extracting the four partitions
+    of the stiffness matrix, i.e., free-free, free-restrained, restrained-
+    free and restrained-restrained, with the supports fixed instead of 
+    elastic.
+
+    Parameters
+    ----------
+    nel_x, nel_y: int
+        The number of elements along the length and the height.
+    method: {'Permutation', 'Slicing'}
+        The method, i.e., slices of the matrix permuted once to place the
+        free degrees of freedom first, as by Matrix.getPartitioned, or the
+        former conversion and fancy indexing of the whole matrix per 
+        partition.
+
+    Returns
+    -------
+    elapsed: float
+        The wall time in seconds.
+    peak: float
+        The peak of the allocated memory in MB.
+    """
+
+    model1, coordinates = getModel(nel_x, nel_y)
+    length, height = sum(main.spans), main.height
+
+    labels = np.nonzero(np.isclose(coordinates[:, 1], -height/2) & 
+            ((coordinates[:, 0] < 0.4) | (coordinates[:, 0] > length-0.4)))[0]
+    model1.constraints.addFixation(labels, ['x', 'y'])
+
+    stiffness, = model.assemble(model1, 'stiffness')
+
+    tracemalloc.start()
+    start = tm.perf_counter()
+
+    if method == 'Permutation':
+        blocks = [stiffness.getPartitionFF(), stiffness.getPartitionFR(),
+                stiffness.getPartitionRF(), stiffness.getPartitionRR()]
+    else:
+        fdof = list(model1.fdof.values())
+        rdof = list(model1.rdof.values())
+
+        blocks = [stiffness.full.tocsc()[:, cols].tocsr()[rows, :].tocsc()
+                for rows, cols in [(fdof, fdof), (fdof, rdof), (rdof, fdof),
+                (rdof, rdof)]]
+
+    elapsed = tm.perf_counter()-start
+    peak = tracemalloc.get_traced_memory()[1]/2**20
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def eigensolve(nel_x, nel_y, temperatures, solver, modes=10):
+
+    """
+    Get the frequencies, the LOBPCG iterations and the wall time of the 
+    modal analyses of a temperature sweep, run in order of temperatures as
+    the jobs of a process. The elastic modulus varies linearly from 33 GPa
+    at -10 C to 29 GPa at 40 C, an illustrative temperature dependence.
+
+    Parameters
+    ----------
+    nel_x, nel_y: int
+        The number of elements along the length and the height.
+    temperatures: ndarray
+        The temperatures (s) of the sweep.
+    solver: {'Lanczos', 'LOBPCG'}
+        The eigenvalue solver.
+    modes: int, positive
+        The number of extracted modes.
+
+    Returns
+    -------
+    frequencies: ndarray
+        The frequencies (s x m) of each analysis.
+    iterations: list
+        The number of LOBPCG iterations of each analysis, None if solved
+        by eigsh.
+    elapsed: list
+        The wall time in seconds of each analysis, assembly included.
+    """
+
+    analysis.Modal.previous = None
+    analysis.Modal.nominal = None
+
+    job = getJob(nel_x, nel_y)
+    job.setMaterial(np.array([[33e9, 0.3, -10], [29e9, 0.3, 40]]))
+
+    frequencies, iterations, elapsed = [], [], []
+
+    for temperature in temperatures:
+        job.setTemperature(np.array([[temperature, 0.5]]))
+        model1, coordinates = main.getModel(job)
+
+        start = tm.perf_counter()
+        modal = analysis.Modal(model1)
+        modal.setNumberOfEigenvalues(modes)
+        modal.setEigenSolver(solver)
+        modal.submit()
+        elapsed.append(tm.perf_counter()-start)
+
+        frequencies.append(modal.frequencies)
+        iterations.append(modal.iterations)
+
+    return np.array(frequencies), iterations, elapsed
+
+
+if __name__ == '__main__':
+
+    # Scaling benchmark from 1k up to 1M degrees of freedom, or up to the
+    # size specified in the command line. A stage failing for lack of
+    # memory is reported and larger meshes are skipped.
+
+    limit = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6
+    sizes = [size for size in [10**3, 10**4, 10**5, 10**6] if size <= limit]
+
+    stages = ['Setup', 'Assembly', 'Eigen', 'Integration', 'Output']
+    sys.stdout.write('{:>10}{:>8}{:>8}'.format('DOFs', 'nel_x', 'nel_y'))
+    sys.stdout.write(''.join('{:>13}'.format(stage) for stage in stages)+'\n')
+
+    for size in sizes:
+        nel_x, nel_y = getMeshDensity(size)
+        ndof = 2*(nel_x+1)*(nel_y+1)
+        sys.stdout.write('{:>10}{:>8}{:>8}'.format(ndof, nel_x, nel_y))
+
+        try:
+            timings = run(nel_x, nel_y)
+        except MemoryError:
+            sys.stdout.write('   Out of memory\n')
+            break
+
+        sys.stdout.write(''.join('{:>13.3f}'.format(timings[stage])
+                for stage in stages)+'\n')
+
+
+    # Fill-in and factorization time of the stiffness matrix for natural
+    # and bandwidth-reducing numbering of the degrees of freedom
+
+    orderings = ['NATURAL', 'COLAMD', 'MMD_AT_PLUS_A']
+    sys.stdout.write('\n{:>10}{:>10}'.format('DOFs', 'Numbering'))
+    sys.stdout.write(''.join('{:>26}'.format(ordering) for ordering in orderings)+'\n')
+
+    for size in sizes:
+        nel_x, nel_y = getMeshDensity(size)
+        ndof = 2*(nel_x+1)*(nel_y+1)
+
+        for numbering in ['Natural', 'RCM']:
+            sys.stdout.write('{:>10}{:>10}'.format(ndof, numbering))
+
+            try:
+                results = [factorize(nel_x, nel_y, numbering, ordering) 
+                        for ordering in orderings]
+            except MemoryError:
+                sys.stdout.write('   Out of memory\n')
+                break
+
+            sys.stdout.write(''.join('{:>16d}{:>10.3f}'.format(*result) 
+                    for result in results)+'\n')
+
+
+    # Wall time and peak memory of the stiffness matrix partitions, by the
+    # cached permutation and by the former per-partition slicing
+
+    methods = ['Permutation', 'Slicing']
+    sys.stdout.write('\n{:>10}'.format('DOFs'))
+    sys.stdout.write(''.join('{:>23}'.format(method) for method in methods)+'\n')
+
+    for size in [size for size in sizes if size <= 10**5]:
+        nel_x, nel_y = getMeshDensity(size)
+        ndof = 2*(nel_x+1)*(nel_y+1)
+
+        sys.stdout.write('{:>10}'.format(ndof))
+        sys.stdout.write(''.join('{:>10.2f} ms{:>8.2f} MB'.format(elapsed*1e3, peak) 
+                for elapsed, peak in [partition(nel_x, nel_y, method) 
+                for method in methods])+'\n')
+
+
+    # Cold eigsh against warm-started LOBPCG along a temperature sweep. The
+    # first analysis of LOBPCG is solved by eigsh and excluded from the
+    # mean wall time and iterations.
+
+    temperatures = np.linspace(-10, 40, 11)
+
+    sys.stdout.write('\n{:>10}{:>10}{:>13}{:>13}{:>13}{:>13}\n'.format('DOFs', 
+            'Solver', 'Total', 'Mean', 'Iterations', 'Deviation'))
+
+    for size in [size for size in sizes if size <= 10**5]:
+        nel_x, nel_y = getMeshDensity(size)
+        ndof = 2*(nel_x+1)*(nel_y+1)
+
+        reference, iterations, elapsed = eigensolve(nel_x, nel_y, temperatures, 'Lanczos')
+        sys.stdout.write('{:>10}{:>10}{:>13.3f}{:>13.3f}{:>13}{:>13}\n'.format(
+                ndof, 'Lanczos', np.sum(elapsed), np.mean(elapsed[1:]), '-', '-'))
+
+        frequencies, iterations, elapsed = eigensolve(nel_x, nel_y, temperatures, 'LOBPCG')
+        warm = [item for item in iterations[1:] if item is not None]
+        deviation = np.max(np.abs(frequencies/reference-1))
+
+        sys.stdout.write('{:>10}{:>10}{:>13.3f}{:>13.3f}{:>13}{:>13.2e}\n'.format(
+                ndof, 'LOBPCG', np.sum(elapsed), np.mean(elapsed[1:]), 
+                '{:.1f}'.format(np.mean(warm)) if warm else '-', deviation))
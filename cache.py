@@ -0,0 +1,381 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+import numpy as np
+import scipy.sparse as sps
+
+import output as out
+import loadcases
+
+
+cache = None
+
+# Modules whose source determines the job results, so that results computed
+# by a different version of the code are never reused
+
+modules = ['main', 'front2back', 'model', 'analysis', 'quadrilaterals',
+        'quadrature', 'material', 'loadcases', 'output', 'cache']
+
+
+class EntryWriter(out.NumpyWriter):
+
+    """
+    Class for writing the entries of the result cache, i.e., a .npy file per
+    quantity and a JSON file with the channel labels and the names of the
+    metadata arrays. The number format and text header of each quantity are
+    recorded, so that cached results are written as text exactly as when
+    computed.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.formats = {}
+        self.headers = {}
+
+
+    def open(self, quantity, shape, labels=None, fmt='% .16e', header=None):
+
+        super().open(quantity, shape, labels, fmt, header)
+        self.formats[quantity] = fmt
+        self.headers[quantity] = header
+
+
+    def close(self):
+
+        arrays = [key for key, value in self.metadata.items()
+                if isinstance(value, np.ndarray)]
+
+        self.setMetadata(formats=self.formats, headers=self.headers, arrays=arrays)
+        super().close()
+
+
+
+class ResultCache:
+
+    """
+    Class for the cache of job results on disk. Each entry is a folder
+    named by the SHA-1 digest of the parameters determining its results and
+    of the code version, and stores either the result quantities of a job,
+    as they are written, or the assembled system matrices of a structural
+    state. Entries are written under temporary names and then renamed, so
+    that concurrent jobs never read partially written entries. When the
+    total size of the entries exceeds the size limit, the least recently
+    used entries are evicted.
+
+    Parameters
+    ----------
+    folder: str
+        The cache folder.
+    size: int
+        The size limit in bytes. A zero size disables the cache.
+
+    Attributes
+    ----------
+    version: str
+        The digest of the source files of the modules computing the results.
+
+    Methods
+    -------
+    getKey(*items)
+        Get the key of an entry.
+    get(key)
+        Get the result quantities of an entry.
+    getWriter(key)
+        Get the writer of a new entry.
+    put(key, writer)
+        Store a new entry.
+    getMatrices(key)
+        Get the system matrices of an entry.
+    putMatrices(key, **matrices)
+        Store system matrices as a new entry.
+    evict()
+        Evict the least recently used entries exceeding the size limit.
+    """
+
+    def __init__(self, folder=os.path.join('.cache', 'results'), size=2**31):
+        self.folder = folder
+        self.size = size
+        self.version = getVersion()
+
+
+    def getKey(self, *items):
+
+        """
+        Get the key of an entry, as the digest of the canonical JSON form of
+        the code version and the specified items, e.g., job parameters,
+        arrays included.
+
+        Parameters
+        ----------
+        items: tuple
+            The JSON serializable items, arrays and numpy scalars included.
+
+        Returns
+        -------
+        key: str
+            The key.
+        """
+
+        text = json.dumps([self.version, items], sort_keys=True,
+                default=out.serialize)
+
+        return hashlib.sha1(text.encode()).hexdigest()
+
+
+    def get(self, key):
+
+        """
+        Get the result quantities of an entry, marking the entry as recently
+        used.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry.
+
+        Returns
+        -------
+        entry: dict or None
+            The memory-mapped quantities, keyed by name, each as a tuple of
+            data, channel labels, number format and text header, and the
+            metadata arrays under the keys 'Quantities' and 'Metadata'
+            respectively. None if the entry is not cached.
+        """
+
+        folder = os.path.join(self.folder, key)
+        info = os.path.join(folder, 'entry_metadata.json')
+
+        if self.size <= 0 or not os.path.isfile(info):
+            return None
+
+        with open(info) as file:
+            metadata = json.load(file)
+
+        os.utime(info)
+
+        fname = os.path.join(folder, 'entry_{}.npy')
+        formats = metadata['parameters']['formats']
+        headers = metadata['parameters']['headers']
+
+        quantities = {quantity: (np.load(fname.format(quantity), mmap_mode='r'),
+                labels, formats[quantity], headers[quantity])
+                for quantity, labels in metadata['labels'].items()}
+
+        arrays = {name: np.load(fname.format(name))
+                for name in metadata['parameters']['arrays']}
+
+        return {'Quantities': quantities, 'Metadata': arrays}
+
+
+    def getWriter(self, key):
+
+        """
+        Get the writer of a new entry, writing in a temporary folder until
+        the entry is stored by put.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry.
+
+        Returns
+        -------
+        writer: EntryWriter
+            The writer.
+        """
+
+        folder = os.path.join(self.folder, '{}.{}'.format(key, os.getpid()))
+        os.makedirs(folder, exist_ok=True)
+
+        return EntryWriter(os.path.join(folder, 'entry'))
+
+
+    def put(self, key, writer):
+
+        """
+        Store a new entry and evict the least recently used entries, if the
+        size limit is exceeded. An entry already stored, e.g., by a
+        concurrent job, is retained.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry.
+        writer: EntryWriter
+            The closed writer of the entry.
+        """
+
+        temporary = os.path.dirname(writer.name)
+
+        try:
+            os.replace(temporary, os.path.join(self.folder, key))
+        except OSError:
+            shutil.rmtree(temporary, ignore_errors=True)
+
+        self.evict()
+
+
+    def getMatrices(self, key):
+
+        """
+        Get the system matrices of an entry.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry.
+
+        Returns
+        -------
+        matrices: dict or None
+            The sparse matrices, keyed by name. None if the entry is not
+            cached.
+        """
+
+        entry = self.get(key)
+
+        if entry is None:
+            return None
+
+        quantities, arrays = entry['Quantities'], entry['Metadata']
+        names = [name[:-len('_shape')] for name in arrays]
+
+        return {name: sps.csr_matrix((np.array(quantities[name+'_data'][0]),
+                np.array(quantities[name+'_indices'][0], dtype=int),
+                np.array(quantities[name+'_indptr'][0], dtype=int)),
+                shape=tuple(arrays[name+'_shape'].astype(int)))
+                for name in names}
+
+
+    def putMatrices(self, key, **matrices):
+
+        """
+        Store system matrices as a new entry.
+
+        Parameters
+        ----------
+        key: str
+            The key of the entry.
+        matrices: dict
+            The sparse matrices, keyed by name.
+        """
+
+        writer = self.getWriter(key)
+
+        for name, matrix in matrices.items():
+            matrix = sps.csr_matrix(matrix)
+
+            for part in ['data', 'indices', 'indptr']:
+                writer.write('{}_{}'.format(name, part), getattr(matrix, part))
+
+            writer.setMetadata(**{name+'_shape': np.array(matrix.shape)})
+
+        writer.close()
+        self.put(key, writer)
+
+
+    def evict(self):
+
+        """
+        Evict the least recently used entries, until their total size does
+        not exceed the size limit. Temporary folders of failed jobs are
+        evicted as entries, while those of running jobs are skipped.
+        """
+
+        entries = []
+
+        for name in os.listdir(self.folder):
+            folder = os.path.join(self.folder, name)
+
+            try:
+                fnames = [os.path.join(folder, fname) for fname in os.listdir(folder)]
+                size = sum(os.path.getsize(fname) for fname in fnames)
+                used = max([os.path.getmtime(fname) for fname in fnames]+
+                        [os.path.getmtime(folder)])
+            except OSError:
+                continue
+
+            pid = name.partition('.')[2]
+
+            if pid.isdigit() and isRunning(int(pid), used):
+                continue
+
+            entries.append((used, size, folder))
+
+        total = sum(size for used, size, folder in entries)
+
+        for used, size, folder in sorted(entries):
+            if total <= self.size:
+                break
+
+            shutil.rmtree(folder, ignore_errors=True)
+            total -= size
+
+
+
+def isRunning(pid, used):
+
+    """
+    Check whether the process writing a temporary folder, last used at the
+    specified time, is running. Where processes cannot be queried without
+    being signalled, i.e., on Windows, folders used within the last day are
+    assumed to be written by running processes.
+    """
+
+    if os.name == 'nt':
+        return time.time()-used < 86400
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def getVersion():
+
+    """ Get the digest of the source files of the modules in modules. """
+
+    digest = hashlib.sha1()
+    folder = os.path.dirname(os.path.abspath(__file__))
+
+    for module in modules:
+        fname = os.path.join(folder, module+'.py')
+
+        if os.path.isfile(fname):
+            digest.update(loadcases.getDigest(fname).encode())
+
+    return digest.hexdigest()
+
+
+def getCache():
+
+    """
+    Get the result cache of the process. The cache is disabled, unless
+    enabled by setCache.
+    """
+
+    global cache
+
+    if cache is None:
+        cache = ResultCache(size=0)
+
+    return cache
+
+
+def setCache(folder=os.path.join('.cache', 'results'), size=2**31):
+
+    """
+    Enable the result cache of the process, by specifying its folder and
+    size limit in bytes. A zero size disables the cache.
+    """
+
+    global cache
+
+    cache = ResultCache(folder, size)
@@ -20,6 +20,9 @@ class BackendJob:
         # Set default values for boundary conditions (Kx, Ky, T)
         self.setBoundaries(np.array([[1e15, 1e10, 20]]))
 
+        # Set default support layout (positions x/L, spring offsets)
+        self.setSupports()
+
         # Set default values for corrosion wastage (W, x/L)
         self.setCorrosion(np.array([[0.0, 0.5]]))
 
@@ -35,6 +38,18 @@ class BackendJob:
         # Set default values for time history analysis (a, b, period, step, load)
         self.setTimeHistorySettings(0.002, 0.0001, 50, 0.005, 0)
 
+        # Set default values for time history solver (modes, cut-off, ...)
+        self.setSolverSettings()
+
+        # Set default eigenvalue solver of modal and time history analysis
+        self.setEigenSolver('Lanczos')
+
+        # Set default mesh density (elements along the length and height)
+        self.setMesh(200, 6)
+
+        # Set default output format
+        self.setOutputFormat('dat')
+
 
     def setName(self, name):
 
@@ -178,6 +193,53 @@ class BackendJob:
         return self._boundary1, self._boundary2, self._boundary3
 
 
+    def setSupports(self, positions=(0, 0.5, 1), springs=None):
+
+        """
+        Specify the layout of the supports along the bottom of the system.
+        Each support consists of springs with the stiffness specified by
+        setBoundaries, springs mapped to the same node being merged into a
+        single spring of the total stiffness.
+
+        Parameters
+        ----------
+        positions: tuple
+            The positions (x/L) of the left-most, middle and right-most 
+            support.
+        springs: tuple, optional
+            The offsets (m) of the springs of each support from its position,
+            as a 1-dimensional ndarray per support. If not specified, springs
+            are spaced by 0.125 m, four extending from the left-most support
+            and the right-most support into the system and five centered at
+            the middle support.
+
+        Raises
+        ------
+        TypeError
+            If not exactly three positions and spring offsets are specified.
+
+        Example
+        -------
+        job = BackendJob('Job-1')
+        job.setSupports(positions=(0, 0.4, 1))
+        """
+
+        if springs is None:
+            springs = (0.125*np.arange(0, 4), 0.125*np.arange(-2, 3), 
+                    0.125*np.arange(-3, 1))
+
+        if len(positions) != 3 or len(springs) != 3:
+            raise TypeError('Three supports must be specified.')
+
+        self._supports = {}
+        self._supports['Positions'] = [float(position) for position in positions]
+        self._supports['Springs'] = [np.atleast_1d(np.asarray(offsets, dtype=float)) 
+                for offsets in springs]
+
+    def getSupports(self):
+        return self._supports
+
+
     def setCorrosion(self, corrosion):
 
         """
@@ -293,6 +355,172 @@ class BackendJob:
         return self._timeHistorySettings
 
 
+    def setSolverSettings(self, modes=10, cutoff=None, participation=None, 
+            basis='Load', method='Newmark', increment=None, block=None):
+
+        """
+        Specify the solver settings for time history analysis, which trade
+        the accuracy of the response against the computational cost.
+
+        Parameters
+        ----------
+        modes: int, positive
+            The number of vibration modes extracted for modal superposition.
+        cutoff: float, positive, optional
+            The frequency above which the extracted modes are discarded.
+        participation: float, optional
+            The participation ratio [0-1] at which the modal basis is 
+            truncated.
+        basis: {'Load', 'Mass'}
+            The basis of the participation ratio.
+        method: {'Newmark', 'Exact'}
+            The time integration method.
+        increment: float, positive, optional
+            The integration time increment. If not specified, it is 
+            determined from the output time increment.
+        block: int, positive, optional
+            The number of integration increments per time block. The 
+            response is integrated and written block by block, bounding the
+            memory demand of long simulations. If not specified, the whole
+            period forms a single block.
+        """
+
+        self._solverSettings = {}
+        self._solverSettings['Modes'] = modes
+        self._solverSettings['Cutoff'] = cutoff
+        self._solverSettings['Participation'] = participation
+        self._solverSettings['Basis'] = basis
+        self._solverSettings['Method'] = method
+        self._solverSettings['Increment'] = increment
+        self._solverSettings['Block'] = block
+
+    def getSolverSettings(self):
+        return self._solverSettings
+
+
+    def setEigenSolver(self, solver='Lanczos', iterations=50, tolerance=1e-6):
+
+        """
+        Specify the eigenvalue solver of modal and time history analysis.
+
+        Parameters
+        ----------
+        solver: {'Lanczos', 'LOBPCG'}
+            The eigenvalue solver, i.e., eigsh in shift-invert mode, or 
+            LOBPCG starting from the mode shapes of the previous job of the
+            same process, which suits sweeps of slightly different models 
+            and falls back to eigsh when not converged.
+        iterations: int, positive
+            The maximum number of LOBPCG iterations.
+        tolerance: float, positive
+            The relative residual norm at which LOBPCG is converged.
+        """
+
+        self._eigenSolver = {}
+        self._eigenSolver['Solver'] = solver
+        self._eigenSolver['Iterations'] = iterations
+        self._eigenSolver['Tolerance'] = tolerance
+
+    def getEigenSolver(self):
+        return self._eigenSolver
+
+
+    def setMesh(self, nel_x=200, nel_y=6, numbering='Natural'):
+
+        """
+        Specify the mesh density. Damaged areas, supports, loads and output
+        locations are defined in physical coordinates and mapped to the 
+        nodes and elements of the generated mesh.
+
+        Parameters
+        ----------
+        nel_x: int, positive
+            The number of elements along the length of the system.
+        nel_y: int, positive
+            The number of elements along the height of the system.
+        numbering: {'Natural', 'RCM'}
+            The numbering of degrees of freedom, either in order of nodes 
+            or bandwidth-reducing (reverse Cuthill-McKee). The generated 
+            mesh is numbered column by column, so that RCM numbering hardly
+            changes the fill-in of factorizations, see the README.
+
+        Raises
+        ------
+        TypeError
+            If a non-positive number of elements is specified.
+        """
+
+        if nel_x <= 0 or nel_y <= 0:
+            raise TypeError('Number of elements must be positive.')
+
+        self._mesh = {}
+        self._mesh['Length'] = nel_x
+        self._mesh['Height'] = nel_y
+        self._mesh['Numbering'] = numbering
+
+    def getMesh(self):
+        return self._mesh
+
+
+    def setOutputFormat(self, fmt):
+
+        """
+        Specify the format of the output files.
+
+        Parameters
+        ----------
+        fmt: {'dat', 'npy', 'npz'}
+            The output format, i.e., a text file per quantity, a binary file
+            per quantity with the metadata in a JSON file, or a single binary
+            archive including the metadata.
+
+        Raises
+        ------
+        TypeError
+            If an invalid output format is specified.
+        """
+
+        if fmt.lower() not in ['dat', 'npy', 'npz']:
+            error = 'Output format must be either "{}", "{}" or "{}".'
+            raise TypeError(error.format('dat', 'npy', 'npz'))
+
+        self._outputFormat = fmt.lower()
+
+    def getOutputFormat(self):
+        return self._outputFormat
+
+
+    def getParameters(self):
+
+        """
+        Get the job parameters.
+
+        Returns
+        -------
+        parameters: dict
+            The job parameters, keyed by name.
+        """
+
+        parameters = {}
+        parameters['Name'] = self.getName()
+        parameters['Model'] = self.getModel()
+        parameters['Thickness'] = self.getThickness()
+        parameters['Damage'] = self.getDamage()
+        parameters['Material'] = self.getMaterial()
+        parameters['Boundaries'] = self.getBoundaries()
+        parameters['Supports'] = self.getSupports()
+        parameters['Corrosion'] = self.getCorrosion()
+        parameters['Temperature'] = self.getTemperature()
+        parameters['Analysis'] = self.getAnalysis()
+        parameters['Modal'] = self.getModalSettings()
+        parameters['Time history'] = self.getTimeHistorySettings()
+        parameters['Solver'] = self.getSolverSettings()
+        parameters['Eigensolver'] = self.getEigenSolver()
+        parameters['Mesh'] = self.getMesh()
+
+        return parameters
+
+
 
 def convert(frontJob):
 
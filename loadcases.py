@@ -0,0 +1,412 @@
+import os
+import json
+import hashlib
+import functools
+
+import numpy as np
+
+
+library = None
+
+
+class Library:
+
+    """
+    Class for the registry of load cases. Load cases are either text files,
+    which are converted once to binary files in the cache folder and memory
+    mapped on subsequent requests, or functions generating the load data on
+    the fly. A cached file is converted again when the modification time or
+    size of its source changes and its contents differ.
+
+    Parameters
+    ----------
+    folder: str
+        The cache folder.
+
+    Methods
+    -------
+    register(name, source)
+        Register a load case.
+    get(name, **kwargs)
+        Get the data of a load case.
+    load(fname)
+        Load a text file through the cache.
+    getVersion(name)
+        Get an identifier of the data of a load case.
+    """
+
+    def __init__(self, folder=os.path.join('.cache', 'loads')):
+        self.folder = folder
+        self.cases = {}
+        self.arrays = {}
+
+
+    def register(self, name, source):
+
+        """
+        Register a load case.
+
+        Parameters
+        ----------
+        name: str
+            The name of the load case.
+        source: str or function
+            The name of a text file with a single header line, or a function
+            returning the load data for the keyword arguments passed to get.
+        """
+
+        self.cases[name] = source
+
+
+    def get(self, name, **kwargs):
+
+        """
+        Get the data of a load case.
+
+        Parameters
+        ----------
+        name: str
+            The name of the load case.
+        kwargs: dict
+            The arguments of a generated load case.
+
+        Returns
+        -------
+        data: ndarray or object
+            The load data, read-only for load cases stored in files, or the
+            object returned by the generating function.
+
+        Raises
+        ------
+        KeyError
+            If the load case is not registered.
+        """
+
+        source = self.cases[name]
+
+        if callable(source):
+            return source(**kwargs)
+
+        return self.load(source)
+
+
+    def getVersion(self, name):
+
+        """
+        Get an identifier of the data of a load case, i.e., the digest of 
+        the contents of its file, or the qualified name of its generating
+        function.
+
+        Parameters
+        ----------
+        name: str
+            The name of the load case.
+
+        Returns
+        -------
+        version: str
+            The identifier.
+        """
+
+        source = self.cases[name]
+
+        if callable(source):
+            return '{}.{}'.format(source.__module__, source.__qualname__)
+
+        return getDigest(source)
+
+
+    def load(self, fname):
+
+        """
+        Load a text file with a single header line through the cache.
+
+        Parameters
+        ----------
+        fname: str
+            The file name.
+
+        Returns
+        -------
+        data: ndarray
+            The memory-mapped file data.
+        """
+
+        status = os.stat(fname)
+        stamp = [status.st_mtime, status.st_size]
+
+        if fname in self.arrays and self.arrays[fname][0] == stamp:
+            return self.arrays[fname][1]
+
+        name = os.path.splitext(os.path.basename(fname))[0]
+        cached = os.path.join(self.folder, name+'.npy')
+        info = os.path.join(self.folder, name+'.json')
+
+        metadata = {}
+
+        if os.path.isfile(cached) and os.path.isfile(info):
+            with open(info) as file:
+                metadata = json.load(file)
+
+        if metadata.get('source') != os.path.abspath(fname) or \
+                not os.path.isfile(cached):
+            metadata = {}
+
+        if metadata.get('stamp') != stamp:
+            digest = getDigest(fname)
+
+            # Files are written under temporary names and then renamed, so 
+            # that concurrent jobs never read partially written files
+
+            temporary = '{}.{}'.format(cached, os.getpid())
+
+            if metadata.get('digest') != digest:
+                os.makedirs(self.folder, exist_ok=True)
+
+                with open(temporary, 'wb') as file:
+                    np.save(file, np.loadtxt(fname, skiprows=1))
+
+                os.replace(temporary, cached)
+
+            metadata = {'source': os.path.abspath(fname), 'stamp': stamp,
+                    'digest': digest}
+
+            with open(temporary, 'w') as file:
+                json.dump(metadata, file)
+
+            os.replace(temporary, info)
+
+        data = np.load(cached, mmap_mode='r')
+        self.arrays[fname] = (stamp, data)
+
+        return data
+
+
+
+def getDigest(fname):
+
+    """ Get the SHA-1 digest of the contents of a file. """
+
+    digest = hashlib.sha1()
+
+    with open(fname, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class Traffic:
+
+    """
+    Class for the nodal forces of random traffic crossing a lane. Vehicles 
+    arrive at the start of the lane as a Poisson process and travel along 
+    it at constant velocity, each vehicle being a point load distributed to
+    the two adjacent lane nodes by linear interpolation. Only the vehicles
+    are stored, while the forces, sampled at the time increment, are 
+    generated on request for the time instants of each time block, so that
+    the memory demand does not grow with the time period.
+
+    Parameters
+    ----------
+    positions: ndarray
+        The ascending positions (n) of the lane nodes.
+    period: float, positive
+        The time period.
+    increment: float, positive
+        The time increment.
+    rate: float, positive
+        The mean arrival rate of vehicles per second.
+    velocity: tuple
+        The range of the uniformly distributed vehicle velocities.
+    load: tuple
+        The range of the uniformly distributed vehicle loads.
+    seed: int
+        The seed of the random number generator.
+
+    Methods
+    -------
+    getForces(time)
+        Get the nodal forces at the specified time instants.
+    getForce(node, time)
+        Get the force of a lane node at the specified time instants.
+    getFunctions()
+        Get the load function of each lane node.
+    """
+
+    def __init__(self, positions, period, increment, rate=0.1, 
+            velocity=(10, 25), load=(10e3, 50e3), seed=0):
+
+        generator = np.random.RandomState(seed)
+
+        self.positions = np.asarray(positions, dtype=float)
+        self.increment = increment
+        self.samples = len(np.arange(0, period+increment, increment))
+        self.forces = (None, None)
+
+        length = self.positions[-1]-self.positions[0]
+        arrival = -length/velocity[0]
+        vehicles = []
+
+        while True:
+            arrival += generator.exponential(1/rate)
+
+            if arrival > period:
+                break
+
+            speed = generator.uniform(*velocity)
+            value = generator.uniform(*load)
+            vehicles.append([arrival, speed, value])
+
+        self.vehicles = np.array(vehicles).reshape(-1, 3)
+
+
+    def getForces(self, time):
+
+        """
+        Get the nodal forces at the specified time instants, interpolated
+        linearly between the samples at the time increment.
+
+        Parameters
+        ----------
+        time: ndarray
+            The ascending time instants (t).
+
+        Returns
+        -------
+        forces: ndarray
+            The nodal forces (t x n).
+        """
+
+        time = np.asarray(time, dtype=float)
+        positions, increment = self.positions, self.increment
+
+        #  Samples enclosing the time instants, at the same instants as 
+        #  those of the whole period
+
+        first = min(max(int(np.floor(time[0]/increment))-1, 0), self.samples-1)
+        last = min(max(int(np.ceil(time[-1]/increment))+2, first+1), self.samples)
+        samples = np.arange(first, last)*increment
+
+        forces = np.zeros((len(samples), len(positions)))
+
+        length = positions[-1]-positions[0]
+        arrival, speed, value = self.vehicles.T
+        departure = arrival+length/speed
+
+        for i in np.nonzero((arrival <= samples[-1]) & (departure >= samples[0]))[0]:
+            steps = np.nonzero((samples >= arrival[i]) & (samples <= departure[i]))[0]
+            location = positions[0]+(samples[steps]-arrival[i])*speed[i]
+
+            right = np.clip(np.searchsorted(positions, location, side='right'), 1, len(positions)-1)
+            weight = (location-positions[right-1])/(positions[right]-positions[right-1])
+
+            np.add.at(forces, (steps, right-1), value[i]*(1-weight))
+            np.add.at(forces, (steps, right), value[i]*weight)
+
+        return np.column_stack([np.interp(time, samples, force) for force in forces.T])
+
+
+    def getForce(self, node, time):
+
+        """
+        Get the force of a lane node at the specified time instants. The 
+        forces of all nodes are generated once for successive requests of 
+        the same time instants, e.g., for the loads of a time block.
+
+        Parameters
+        ----------
+        node: int
+            The index of the lane node.
+        time: ndarray
+            The ascending time instants (t).
+
+        Returns
+        -------
+        force: ndarray
+            The nodal force (t).
+        """
+
+        if self.forces[0] is not time:
+            self.forces = (time, self.getForces(time))
+
+        return self.forces[1][:, node]
+
+
+    def getFunctions(self):
+
+        """
+        Get the load function of each lane node, i.e., a function returning
+        the force of the node at given time instants, to be passed to 
+        Load.addForce.
+        """
+
+        return [functools.partial(self.getForce, node) 
+                for node in range(len(self.positions))]
+
+
+
+def getTraffic(positions, period, increment, rate=0.1, velocity=(10, 25),
+        load=(10e3, 50e3), seed=0):
+
+    """
+    Get the nodal forces of random traffic crossing a lane over the whole
+    time period, see Traffic.
+
+    Parameters
+    ----------
+    positions: ndarray
+        The ascending positions (n) of the lane nodes.
+    period: float, positive
+        The time period.
+    increment: float, positive
+        The time increment.
+    rate: float, positive
+        The mean arrival rate of vehicles per second.
+    velocity: tuple
+        The range of the uniformly distributed vehicle velocities.
+    load: tuple
+        The range of the uniformly distributed vehicle loads.
+    seed: int
+        The seed of the random number generator.
+
+    Returns
+    -------
+    data: ndarray
+        The time instants and the nodal forces (t x n+1), in the layout of
+        the load case files, i.e., with the time instants in the first 
+        column.
+    """
+
+    traffic = Traffic(positions, period, increment, rate, velocity, load, seed)
+    time = np.arange(0, period+increment, increment)
+
+    return np.column_stack((time, traffic.getForces(time)))
+
+
+def getLibrary():
+
+    """
+    Get the library of the benchmark load cases, keyed by load case index, 
+    i.e., the moving load, the two point loads and the traffic load, the 
+    latter read from the file Load_case_4.dat if available or generated 
+    otherwise. The library is created once per process, so that loaded 
+    files are shared among jobs.
+    """
+
+    global library
+
+    if library is not None:
+        return library
+
+    library = Library()
+
+    for index in [1, 2, 3]:
+        library.register(index-1, 'Load_case_{}.dat'.format(index))
+
+    if os.path.isfile('Load_case_4.dat'):
+        library.register(3, 'Load_case_4.dat')
+    else:
+        library.register(3, Traffic)
+
+    return library
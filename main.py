@@ -7,255 +7,516 @@ import analysis
 import model
 import material
 import front2back
+import output as out
+import loadcases
+import cache
 
 import time as tm
+import traceback
+import multiprocessing
 import numpy as np
+import scipy.sparse as sps
+import scipy.spatial as spatial
 import itertools as it
 import matplotlib.pyplot as plt
 
 
-def submit(job, pipe=sys.stdout.write):
+spans = (12.5, 12.5)    # Lengths of the left-hand and right-hand spans
+height = 0.60           # Height of the beam
+
+meshes = {}             # Meshes shared among jobs, keyed by getMesh arguments
+
+
+def getMesh(length, height_start, height_end, nel_x, nel_y):
 
     """
-    Submit job.
+    Get the node coordinates and element connectivity of a structured mesh
+    of four-node quadrilaterals, with nodes numbered column-wise.
 
     Parameters
     ----------
-    job: front2back.BackendJob
-        The job to be submitted.
-    pipe: function
-        The function to pipe progress messages. When called by the user 
-        interface, messages are by default piped to the message window.
+    length: float
+        The length of the system.
+    height_start, height_end: float
+        The height of the system at its start and end.
+    nel_x, nel_y: int
+        The number of elements along the length and the height.
+
+    Returns
+    -------
+    coordinates: ndarray
+        The node coordinates ((nel_x+1)(nel_y+1) x 2).
+    connectivity: ndarray
+        The node labels (nel_x nel_y x 4) of each element.
     """
 
-    pipe(' \n\n')
-    pipe(' Job {}\n'.format(job.getName()))
-    pipe(' -------------------------------\n')
-    pipe('   Submitted \n')
-    pipe('   {}\n'.format(tm.ctime()))
+    x = np.repeat(np.arange(nel_x+1)*(length/nel_x), nel_y+1)
+    h = height_start-x/length*(height_start-height_end)
+    y = -h/2+np.tile(np.arange(nel_y+1), nel_x+1)*(h/nel_y)
 
-    #  Read job definition
+    coordinates = np.column_stack((x, y))
+
+    i, j = np.meshgrid(np.arange(nel_x), np.arange(nel_y), indexing='ij')
+    first = (i*(nel_y+1)+j).ravel()
+    connectivity = np.column_stack(
+            (first, first+nel_y+1, first+nel_y+2, first+1))
+
+    return coordinates, connectivity
+
+
+
+def getSharedMesh(*args):
+
+    """
+    Get the node coordinates and element connectivity of a structured mesh
+    from the meshes shared among jobs, or compute and share it if not 
+    available. The shared arrays are read-only.
+
+    Parameters
+    ----------
+    args: tuple
+        The arguments of getMesh.
+
+    Returns
+    -------
+    coordinates: ndarray
+        The node coordinates.
+    connectivity: ndarray
+        The node labels of each element.
+    """
+
+    if args not in meshes:
+        arrays = getMesh(*args)
+
+        for array in arrays:
+            array.flags.writeable = False
+
+        meshes[args] = arrays
+
+    return meshes[args]
+
+
+
+def findNodes(coordinates, points, tolerance):
+
+    """
+    Get the labels of the nodes closest to a set of points, using a k-d tree
+    of the node coordinates.
+
+    Parameters
+    ----------
+    coordinates: ndarray
+        The node coordinates (n x 2).
+    points: ndarray
+        The coordinates (m x 2) of the points.
+    tolerance: float
+        The maximum distance of a node from a point along each axis.
+
+    Returns
+    -------
+    labels: ndarray
+        The labels (m) of the nodes closest to the points.
+
+    Raises
+    ------
+    ValueError
+        If no node lies within the tolerance of a point.
+    """
+
+    tree = spatial.cKDTree(coordinates)
+    distance, labels = tree.query(points, p=np.inf, distance_upper_bound=tolerance)
+
+    if np.any(np.isinf(distance)):
+        error = 'No node found within {} of point {}.'
+        raise ValueError(error.format(tolerance, points[np.isinf(distance)][0]))
+
+    return labels
+
+
+
+def findElements(centers, areas):
+
+    """
+    Get the labels of the elements within a set of rectangular areas. An 
+    element lies within an area if its center does, while an area that 
+    contains no element center, e.g., on a coarse mesh, is mapped to the 
+    element with the center closest to its own.
+
+    Parameters
+    ----------
+    centers: ndarray
+        The element center coordinates (e x 2).
+    areas: list
+        The areas, as (x_min, x_max, y_min, y_max) tuples.
+
+    Returns
+    -------
+    labels: list
+        The labels of the elements, in order of areas.
+    """
+
+    labels = []
+
+    for xmin, xmax, ymin, ymax in areas:
+        inside = (centers[:, 0] >= xmin) & (centers[:, 0] <= xmax) & \
+                 (centers[:, 1] >= ymin) & (centers[:, 1] <= ymax)
+
+        if np.any(inside):
+            labels.extend(np.nonzero(inside)[0].tolist())
+        else:
+            center = [(xmin+xmax)/2, (ymin+ymax)/2]
+            labels.append(int(spatial.cKDTree(centers).query(center)[1]))
+
+    return labels
+
+
+
+def getStrainOperator(model1, labels):
+
+    """
+    Get the sparse operator recovering the strains at a set of nodes from 
+    the nodal displacements. The strains of each node are averaged over 
+    its linked elements, with the strains of each element extrapolated from
+    the integration points to the element node matching the node, so that
+    nodes on the boundary or linked to any number of elements are 
+    recovered consistently.
+
+    Parameters
+    ----------
+    model1: Model
+        The model.
+    labels: ndarray
+        The labels (m) of the nodes.
+
+    Returns
+    -------
+    operator: scipy.sparse.csr_matrix
+        The operator (3m x n), where n is the number of degrees of freedom,
+        with rows ordered by node and strain component Exx, Eyy, Exy.
+    """
+
+    mesh, offsets = model1.mesh, model1.getOffsets()
+
+    labels = np.asarray(labels, dtype=int)
+    coordinates = model1.getNodeCoordinates()
+    ndof = model1.getNodeDegreesOfFreedom()
+
+    # Pair each node with each of its linked elements
+
+    counts = mesh.offsets[labels+1]-mesh.offsets[labels]
+
+    owner = np.repeat(np.arange(len(labels)), counts)
+    link = np.arange(counts.sum())-np.repeat(np.cumsum(counts)-counts, counts)
+    elabels = mesh.links[mesh.offsets[labels][owner]+link]
+
+    groups = np.searchsorted(offsets, elabels, side='right')-1
+    rows, cols, values = [], [], []
+
+    for index, group in enumerate(model1.getElementGroups()):
+        selected = groups == index
+        connectivity = group.connectivity[elabels[selected]-offsets[index]]
+
+        ipoints = group.irule[:, :2]
+        B, determinant = group.type.getBatchDeformationMatrix(
+                coordinates[connectivity], ipoints[:, 0], ipoints[:, 1])
+
+        # Extrapolate to the element node of each pair, i.e., to its local
+        # index in the element connectivity
+
+        functions = group.type.getExtrapolationMatrix(group.irule)
+        local = np.argmax(connectivity == labels[owner[selected], np.newaxis], axis=1)
+
+        weights = functions[local]/counts[owner[selected], np.newaxis]
+        operator = np.einsum('ep,epij->eij', weights, B)
+
+        edofs = ndof[connectivity].reshape((len(connectivity), -1)).astype(int)
+        components = 3*owner[selected, np.newaxis]+np.arange(3)
+
+        rows.append(np.broadcast_to(components[:, :, np.newaxis], operator.shape).ravel())
+        cols.append(np.broadcast_to(edofs[:, np.newaxis, :], operator.shape).ravel())
+        values.append(operator.ravel())
+
+    operator = sps.csr_matrix((np.hstack(values), (np.hstack(rows), np.hstack(cols))),
+            shape=(3*len(labels), len(model1.ndof)))
+
+    return operator
+
+
+
+def getTolerance(nel_x, nel_y):
+
+    """
+    Get the tolerance of the search of the nodes closest to physical 
+    locations, i.e., half the larger element dimension of the mesh.
+    """
+
+    return 1e-5+max(sum(spans)/nel_x, height/nel_y)/2
+
+
+
+def getModel(job):
+
+    """
+    Get the model of a job, i.e., the mesh, the material properties and
+    thickness at the integration points of each element, as determined by
+    the structural state, temperature and corrosion, and the support 
+    springs. Modal, time history and static analyses of a job, as well as
+    the benchmarks, analyze the model defined here.
+
+    Parameters
+    ----------
+    job: front2back.BackendJob
+        The job.
+
+    Returns
+    -------
+    model1: Model
+        The model, without loads.
+    coordinates: ndarray
+        The node coordinates (n x 2).
+    """
 
-    jobName = job.getName()
     jobModel = job.getModel()
 
     jobThickness = job.getThickness()
     jobDamage = job.getDamage()
 
     jobMaterial = job.getMaterial()
-    jobBoundary1, jobBoundary2, jobBoundary3 = job.getBoundaries()
+    jobBoundaries = job.getBoundaries()
+    jobSupports = job.getSupports()
     jobWastage = job.getCorrosion()
     jobTemperature = job.getTemperature()
 
-    jobAnalysis = job.getAnalysis()
+    #  Define Geometry
 
+    L1, L2 = spans                  # Length of the left/right-hand span
 
-    if jobAnalysis == 'Modal':
-        modes, normalization = job.getModalSettings().values()
-    else:
-        alpha, beta, period, increment, lcase = job.getTimeHistorySettings().values()
+    length = L1+L2                  # Dimension in x-axis
+    density = 2000                  # Material density
 
+    height_start = height           # Dimension in y-axis
+    height_end = height_start
+
+    width_start = 0.1               # Dimension in z-axis
+    width_end = width_start
 
-    #  Define element labels of damaged areas
+    nel_x, nel_y, numbering = job.getMesh().values()    # Mesh density
+
+    el_size_x = length/nel_x        # Element size in x-direction
+    el_size_y = height_start/nel_y  # Element size in y-direction
+
+
+    #  Define damaged areas (x_min, x_max, y_min, y_max)
 
     if jobModel == 0:     # 'Healthy state'
-        damagedElements = []
+        damagedAreas = []
     elif jobModel == 1:   # 'Damaged state 1'
-        damagedElements = [49*6]
+        damagedAreas = [(6.125, 6.250, -0.30, -0.20)]
     elif jobModel == 2:   # 'Damaged state 2'
-        damagedElements = [49*6, 49*6+1]
+        damagedAreas = [(6.125, 6.250, -0.30, -0.10)]
     elif jobModel == 3:   # 'Damaged state 3'
-        damagedElements = [49*6, 49*6+1, 49*6+2]
+        damagedAreas = [(6.125, 6.250, -0.30, 0.00)]
     elif jobModel == 4:   # 'Damaged state 4'
-        damagedElements = [100*6+5]
+        damagedAreas = [(12.500, 12.625, 0.20, 0.30)]
     elif jobModel == 5:   # 'Damaged state 5'
-        damagedElements = [100*6+5, 100*6+4]
+        damagedAreas = [(12.500, 12.625, 0.10, 0.30)]
     elif jobModel == 6:   # 'Damaged state 6'
-        damagedElements = [100*6+5, 100*6+4, 100*6+3]
+        damagedAreas = [(12.500, 12.625, 0.00, 0.30)]
 
 
-    #  Define Geometry
+    #  Define model nodes and elements
 
-    L1 = 12.5     # Length of the left-hand span
-    L2 = 12.5     # Length of the right-hand span
+    coordinates, connectivity = getSharedMesh(
+            length, height_start, height_end, nel_x, nel_y)
 
-    length = L1+L2                  # Dimension in x-axis
-    density = 2000                  # Material density
+    mesh = model.Mesh(coordinates)
+    mesh.adof[:, :2] = True
 
-    height_start = 0.60             # Dimension in y-axis
-    height_end = height_start
+    etype = quadrilaterals.Quad4()
+    irule = quadrature.Gauss.inQuadrilateral(rule=2).info
 
-    width_start = 0.1               # Dimension in z-axis
-    width_end = width_start
+    # Coordinates of element integration points
 
-    nel_x = 200                    # Number of elements in x-axis
-    nel_y = 6                       # Number of elements in y-axis
+    centers = coordinates[connectivity].mean(axis=1)
+    xi = centers[:, [0]]+irule[:, 0]*el_size_x
 
-    el_size_x = length/nel_x        # Element size in x-direction
-    el_size_y = height_start/nel_y  # Element size in y-direction
+    #  Interpolate temperature at gauss points
 
-    points_x = np.arange(0, length*(1+1/nel_x)-1e-10, length/nel_x)
-    counter = it.count(0)
+    temperature = np.interp(xi, jobTemperature[:, 1]*length, jobTemperature[:, 0])
 
-    points_y = []
-    nodes = []
-    indices = []
+    #  Calculate stiffnes reduction
 
+    damagedElements = findElements(centers, damagedAreas)
 
-    #  Define model nodes
+    reduction = np.zeros((len(connectivity), 1))
+    reduction[damagedElements] = jobDamage/100
 
-    for i, x in enumerate(points_x):
+    #  Define material properties for each integration point
 
-        h = height_start-x/length*(height_start-height_end)
-        points_y.append(np.arange(-h/2, h*(1/2+1/nel_y)-1e-10, h/nel_y))
-        
-        for y in points_y[i]:
-            nodes.append(model.Node([x, y, 0]))
-            nodes[-1].SetValue('adof', ['x', 'y'])
-            label = next(counter)
-            
-            if x < length-1e-10 and y < h/2-1e-10:
-                indices.append(label)    
+    E = np.interp(temperature, jobMaterial[:, 2], jobMaterial[:, 0])*(1-reduction)
+    n = np.interp(temperature, jobMaterial[:, 2], jobMaterial[:, 1])
+    materials = material.LinearElastic(E, n, density)
 
+    #  Interpolate thickness at gauss points
 
-    #  Define model elements
+    wastage = np.interp(xi, jobWastage[:, 1]*length, jobWastage[:, 0])
+    thickness = jobThickness*(1-wastage)
 
-    elements = []
-    etype = quadrilaterals.Quad4()
-    irule = quadrature.Gauss.inQuadrilateral(rule=2).info
+    #  Define element group
 
-    for i, j in enumerate(indices):
+    group = model.ElementGroup(connectivity, etype, materials, thickness, irule)
 
-        #  Define element nodes
 
-        enodes = [nodes[j], nodes[j+nel_y+1], nodes[j+nel_y+2], nodes[j+1]]
+    #  Initialize model
 
-        # Coordinates of element center-point
+    model1 = model.Model(mesh, groups=[group])
+    model1.renumber(numbering)
 
-        xc = np.sum([node.coords[0] for node in enodes])/len(enodes)
-        yc = np.sum([node.coords[1] for node in enodes])/len(enodes)
+    #  Apply boundary conditions. Each support is defined by the positions
+    #  of its springs along the bottom of the beam, with the stiffness of 
+    #  the springs interpolated at the temperature of the support location.
 
-        # Coordinates of element integration points
+    dtol = getTolerance(nel_x, nel_y)       # Tolerance for node searching
 
-        xi = xc+irule[:, 0]*el_size_x
-        yi = yc+irule[:, 1]*el_size_y
+    for position, offsets, boundary in zip(jobSupports['Positions'], 
+            jobSupports['Springs'], jobBoundaries):
 
-        #  Interpolate temperature at gauss points
+        temp = np.interp(position*length, jobTemperature[:, 1]*length, jobTemperature[:, 0])
 
-        temperature = np.interp(xi, jobTemperature[:, 1]*length, jobTemperature[:, 0])
+        kx = np.interp(temp, boundary[:, 2], boundary[:, 0])
+        ky = np.interp(temp, boundary[:, 2], boundary[:, 1])
 
-        #  Calculate stiffnes reduction
+        positions = position*length+offsets
+        points = np.column_stack((positions, np.full(len(positions), -height_start/2)))
+        slabels = np.unique(findNodes(coordinates, points, dtol))
 
-        reduction = jobDamage/100 if i in damagedElements else 0
+        # The stiffness of each support is distributed evenly among its
+        # distinct nodes, which coincide on coarse meshes
 
-        #  Define material properties for each integration point
+        factor = len(positions)/len(slabels)
+        model1.constraints.addSpring(slabels, ['x', 'y'], [kx*factor, ky*factor])
 
-        E = np.interp(temperature, jobMaterial[:, 2], jobMaterial[:, 0])*(1-reduction)
-        n = np.interp(temperature, jobMaterial[:, 2], jobMaterial[:, 1])
-        materials = []
+    return model1, coordinates
 
-        for k in range(len(xi)):
-            materials.append(material.LinearElastic(E[k], n[k], density))
 
-        #  Interpolate thickness at gauss points
 
-        wastage = np.interp(xi, jobWastage[:, 1]*length, jobWastage[:, 0])
-        thickness = jobThickness*(np.ones(len(xi))-wastage)
+def getStructuralItems(job):
 
-        #  Define elements and modify damaged ones
+    """
+    Get the parameters determining the system matrices of a job, i.e., the
+    geometry, the mesh and the structural state, by which the matrices and
+    the modal basis are keyed.
 
-        elements.append(model.Element(enodes, etype, materials, thickness, irule))
+    Parameters
+    ----------
+    job: front2back.BackendJob
+        The job.
 
+    Returns
+    -------
+    structural: list
+        The structural parameters.
+    """
 
-    #  Initialize model
+    parameters = job.getParameters()
+
+    names = ['Model', 'Thickness', 'Damage', 'Material', 'Boundaries', 
+            'Supports', 'Corrosion', 'Temperature', 'Mesh']
+
+    return [spans, height]+[parameters[name] for name in names]
+
+
+def getCacheItems(job):
+
+    """
+    Get the parameters determining the results of a job, by which results 
+    are keyed in the result cache. For time history analysis, the load case
+    data are versioned, i.e., their files are hashed.
+
+    Parameters
+    ----------
+    job: front2back.BackendJob
+        The job.
+
+    Returns
+    -------
+    items: list
+        The parameters determining the job results, i.e., the structural
+        parameters, the type and settings of the analysis and, for time
+        history analysis, the version of the load case data.
+    """
 
-    model1 = model.Model(nodes, elements)
+    parameters = job.getParameters()
+    analysis = job.getAnalysis()
 
-    # Interpolate temperature at boundary locations
+    structural = getStructuralItems(job)
 
-    temp1 = np.interp(0, jobTemperature[:, 1]*length, jobTemperature[:, 0])
-    temp2 = np.interp(length/2, jobTemperature[:, 1]*length, jobTemperature[:, 0])
-    temp3 = np.interp(length, jobTemperature[:, 1]*length, jobTemperature[:, 0])
+    settings = {'Modal': ['Modal', 'Eigensolver'], 
+            'Time history': ['Time history', 'Solver', 'Eigensolver']}
+    items = structural+[analysis]+[parameters[name] 
+            for name in settings.get(analysis, [])]
 
-    # Interpolate boundary values at temperature value
+    if analysis == 'Time history':
+        lcase = parameters['Time history']['lcase']
+        items.append(loadcases.getLibrary().getVersion(lcase))
 
-    kx1 = np.interp(temp1, jobBoundary1[:, 2], jobBoundary1[:, 0])
-    ky1 = np.interp(temp1, jobBoundary1[:, 2], jobBoundary1[:, 1])
+    return items
 
-    kx2 = np.interp(temp2, jobBoundary2[:, 2], jobBoundary2[:, 0])
-    ky2 = np.interp(temp2, jobBoundary2[:, 2], jobBoundary2[:, 1])
 
-    kx3 = np.interp(temp3, jobBoundary3[:, 2], jobBoundary3[:, 0])
-    ky3 = np.interp(temp3, jobBoundary3[:, 2], jobBoundary3[:, 1])
+def submit(job, pipe=sys.stdout.write):
 
-    #  Apply boundary conditions
+    """
+    Submit job.
 
-    dtol = 1e-5+el_size_x/2                 # Tolerance for node searching
-    blabels = []                            # Labels of boundary nodes
+    Parameters
+    ----------
+    job: front2back.BackendJob
+        The job to be submitted.
+    pipe: function
+        The function to pipe progress messages. When called by the user 
+        interface, messages are by default piped to the message window.
+    """
 
-    lposition = 0                           # Left-hand support
-    mposition = L1                          # Intermediate support
-    rposition = length                      # Right-hand support
+    pipe(' \n\n')
+    pipe(' Job {}\n'.format(job.getName()))
+    pipe(' -------------------------------\n')
+    pipe('   Submitted \n')
+    pipe('   {}\n'.format(tm.ctime()))
 
-    for node in nodes:
-        x, y = node.coords[0], node.coords[1]
+    #  Read job definition
 
-        #  Left-hand side constraints
+    jobName = job.getName()
+    jobAnalysis = job.getAnalysis()
 
-        if np.abs(x-lposition) < dtol and np.abs(y + height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx1, ky1])
-        elif np.abs(x-(lposition+el_size_x)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx1, ky1])
-        elif np.abs(x-(lposition+el_size_x*2)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx1, ky1])
-        elif np.abs(x-(lposition+el_size_x*3)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx1, ky1])
 
-        #  Mid-point constraints
+    if jobAnalysis == 'Modal':
+        modes, normalization = job.getModalSettings().values()
+    else:
+        alpha, beta, period, increment, lcase = job.getTimeHistorySettings().values()
+        nmodes, cutoff, participation, basis, method, step, block = job.getSolverSettings().values()
+
 
-        elif np.abs(x-(mposition-el_size_x*2)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx2, ky2])
-        elif np.abs(x-(mposition-el_size_x)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx2, ky2])
-        elif np.abs(x-mposition) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx2, ky2])
-        elif np.abs(x-(mposition+el_size_x)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx2, ky2])
-        elif np.abs(x-(mposition+el_size_x*2)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx2, ky2])
+    #  Define model
 
-        #  Right-hand side constraints
+    model1, coordinates = getModel(job)
 
-        elif np.abs(x-(rposition-el_size_x*3)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx3, ky3])
-        elif np.abs(x-(rposition-el_size_x*2)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx3, ky3])
-        elif np.abs(x-(rposition-el_size_x)) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx3, ky3])
-        elif np.abs(x-rposition) < dtol and np.abs(y+height_start/2) < dtol:
-            blabels.append(node.label)
-            model1.constraints.addSpring(node.label, ['x', 'y'], [kx3, ky3])
+    length = sum(spans)             # Dimension in x-axis
+    height_start = height           # Dimension in y-axis
 
+    nel_x, nel_y, numbering = job.getMesh().values()
+    dtol = getTolerance(nel_x, nel_y)   # Tolerance for node searching
 
-    #  Extract degrees of freedom for output locations. 
 
-    columns = np.arange(5, nel_x+5, 10)[np.newaxis].T*(nel_y+1)
-    olabels = np.tile(np.array([1, 3, 5]), len(columns)).reshape((len(columns), 3))
-    olabels = (columns+olabels).reshape((olabels.size,))
-    odofs = np.sort(np.hstack((olabels*2, olabels*2+1)))
-    ocoords = np.array([(nodes[j].coords[0], nodes[j].coords[1]) for j in olabels])
+    #  Extract degrees of freedom for output locations, at three levels of
+    #  twenty equally spaced sections.
+
+    sections = (np.arange(20)+0.5)*length/20
+    levels = np.array([-1, 0, 1])*height_start/3
+
+    points = np.column_stack((np.repeat(sections, 3), np.tile(levels, 20)))
+    olabels = findNodes(coordinates, points, dtol)
+    odofs = model1.mesh.ndof[olabels, :2].ravel().astype(int)
+    ocoords = coordinates[olabels]
 
 
     # Save labels and coordinates of nodes where response quantities are
@@ -263,18 +524,100 @@ def submit(job, pipe=sys.stdout.write):
 
     output = np.vstack((olabels, ocoords.T)).T
     labels, frmt = 'label  x  y', ['%d', '%10.5f', '%10.5f']
-    np.savetxt('Output_nodes.dat', output, fmt=frmt, header=labels)
+    fname = 'Output_nodes.dat.{}'.format(os.getpid())
+    np.savetxt(fname, output, fmt=frmt, header=labels)
+    os.replace(fname, 'Output_nodes.dat')
 
     # Save labels of measurement degrees of freedom
 
     xlabels = np.array([str(item)+'x' for item in olabels])
     ylabels = np.array([str(item)+'y' for item in olabels])
-    labels = np.vstack((xlabels, ylabels)).T.flatten()
-    labels = '   '.join(label for label in labels)
+    labels = np.vstack((xlabels, ylabels)).T.flatten().tolist()
+
+    #  Define strain recovery operator at output nodes
+
+    soperator = getStrainOperator(model1, olabels)
+
+    #  Look up the results of the job in the result cache. Results not 
+    #  cached are stored as they are written, together with the assembled
+    #  system matrices, which are shared among jobs of the same structural
+    #  state.
+
+    resultCache = cache.getCache()
+    skey = resultCache.getKey(*getStructuralItems(job))
+    key, entry = None, None
+
+    # The results key, which versions the load case files, is computed 
+    # only when the cache is enabled
+
+    if resultCache.size > 0:
+        key = resultCache.getKey(*getCacheItems(job))
+        entry = resultCache.get(key)
+
+    #  Key the structural state of the model, so that its modal basis is
+    #  shared among the modal and time history jobs of a process
+
+    model1.setKey(skey)
+
+    #  Define output writer
+
+    writer = out.getWriter(jobName, job.getOutputFormat())
+
+    if key is not None and entry is None:
+        writer = out.MultiWriter(writer, resultCache.getWriter(key))
+
+        #  Read the system matrices required by the analysis from the cache,
+        #  each stored as an entry of the structural state, or assemble and
+        #  store those not cached
+
+        names = ['stiffness'] if jobAnalysis == 'Static' else ['stiffness', 'mass']
+        mkeys = {name: resultCache.getKey(skey, name) for name in names}
+        matrices = {}
+
+        for name, mkey in mkeys.items():
+            matrices.update(resultCache.getMatrices(mkey) or {})
+
+        missing = [name for name in names if name not in matrices]
+
+        if missing:
+            for name, matrix in zip(missing, model.assemble(model1, *missing)):
+                matrices[name] = matrix.full
+                resultCache.putMatrices(mkeys[name], **{name: matrix.full})
+
+        model1.setMatrices(**matrices)
+
+    writer.setMetadata(parameters=job.getParameters(), nodes=olabels, 
+            coordinates=ocoords)
+
+    #  Define loaded nodes. Distributed loads are applied along the bottom 
+    #  of the beam and point loads on its top at the specified positions.
+
+    nlabels = np.nonzero(np.isclose(coordinates[:, 1], -height_start/2) & 
+            (coordinates[:, 0] > 0))[0]
+
+    plabels = findNodes(coordinates, [[7.75, height_start/2], 
+            [17.25, height_start/2]], dtol)
 
     #  Run analysis
 
-    if jobAnalysis == 'Modal':
+    if entry is not None:
+
+        # Write the cached results
+
+        pipe('   \n')
+        pipe('   Found: results in cache \n')
+        pipe('   Started: writting output \n')
+
+        writer.setMetadata(**entry['Metadata'])
+
+        for quantity, (data, labels, fmt, header) in entry['Quantities'].items():
+            writer.write(quantity, data, labels, fmt, header)
+
+        writer.close()
+
+        pipe('   Completed: writting output \n\n')
+
+    elif jobAnalysis == 'Modal':
 
         # Submit modal analysis
 
@@ -284,9 +627,17 @@ def submit(job, pipe=sys.stdout.write):
         modal = analysis.Modal(model1)
         modal.setNumberOfEigenvalues(modes)
         modal.setNormalizationMethod(normalization)
+        modal.setEigenSolver(*job.getEigenSolver().values())
         modal.submit()
 
-        pipe('   Completed: analysis \n\n')
+        pipe('   Completed: analysis \n')
+        pipe('   Modal basis cache: {Hits} hits, {Misses} misses \n'.format(
+                **analysis.Modal.statistics))
+
+        if modal.iterations is not None:
+            pipe('   Warm-started LOBPCG: {} iterations \n'.format(modal.iterations))
+
+        pipe('   \n')
 
         # Extract mode shapes at output locations
 
@@ -297,8 +648,9 @@ def submit(job, pipe=sys.stdout.write):
 
         pipe('   Started: writting output \n')
 
-        np.savetxt(jobName+'_frequencies.dat', frequencies)
-        np.savetxt(jobName+'_modes.dat', modes, header=labels)
+        writer.write('frequencies', frequencies, fmt='%.18e')
+        writer.write('modes', modes, labels, fmt='%.18e', header='   '.join(labels))
+        writer.close()
 
         pipe('   Completed: writting output \n\n')
 
@@ -308,59 +660,53 @@ def submit(job, pipe=sys.stdout.write):
 
         model1.setDampingCoefficients(alpha, beta)
 
-        # Select load case
-
-        if lcase == 0:
-            nlabels = np.arange(nel_y+1, (nel_x+1)*(nel_y+1) ,nel_y+1)
-            lcase = np.loadtxt('Load_case_1.dat', skiprows=1)
-            velocity, load = lcase[0], lcase[1]
-
-            for j, nlabel in enumerate(nlabels):
+        # Select load case. Load case files are read through the binary
+        # cache of the load case library, while the traffic load is 
+        # generated along the loaded nodes block by block, unless read from
+        # a file.
 
-                t1 = nodes[nlabels[j-1]].coords[0]/velocity
-                t2 = nodes[nlabels[j]].coords[0]/velocity
+        library = loadcases.getLibrary()
 
-                if j == 0:
-                    t1 = t2-1e-5
+        if lcase == 0:
+            velocity, load = library.get(0)
 
-                if j == nlabels.shape[0]-1:
-                    t3 = t2+1e-5
-                else:
-                    t3 = nodes[nlabels[j+1]].coords[0]/velocity
+            t2 = model1.getNodeCoordinates()[nlabels, 0]/velocity
+            t1 = np.hstack((t2[0]-1e-5, t2[:-1]))
+            t3 = np.hstack((t2[1:], t2[-1]+1e-5))
 
-                time = np.array([t1, t2, t3])
-                force = np.array([0, 1e3*load, 0])
-                amplitude = [np.array([time, force])]
+            force = np.array([0, 1e3*load, 0])
+            amplitudes = [np.array([time, force]) 
+                    for time in np.column_stack((t1, t2, t3))]
 
-                model.Load(model1).addForce(nodes[nlabel].label, 'y', amplitude)
+            model.Load(model1).addForce(nlabels, 'y', amplitudes)
 
         elif lcase == 1:
-            nlabel = 63*(nel_y+1)-1
-
-            lcase = np.loadtxt('Load_case_2.dat', skiprows=1)
-            time, force = lcase[:, 0], lcase[:, 1]
+            data = library.get(1)
+            time, force = data[:, 0], data[:, 1]
             amplitude = [np.array([time, force])]
 
-            model.Load(model1).addForce(nodes[nlabel].label, 'y', amplitude)
+            model.Load(model1).addForce(plabels[0], 'y', amplitude)
 
         elif lcase == 2:
-            nlabel = 139*(nel_y+1)-1
-
-            lcase = np.loadtxt('Load_case_3.dat', skiprows=1)
-            time, force = lcase[:, 0], lcase[:, 1]
+            data = library.get(2)
+            time, force = data[:, 0], data[:, 1]
             amplitude = [np.array([time, force])]
 
-            model.Load(model1).addForce(nodes[nlabel].label, 'y', amplitude)
+            model.Load(model1).addForce(plabels[1], 'y', amplitude)
 
         elif lcase == 3:
-            lcase = np.loadtxt('Load_case_4.dat', skiprows=1)
-            time, forces = lcase[:, 0], lcase[:, 1:]
-            nlabels = np.arange(nel_y+1, (nel_x+1)*(nel_y+1), nel_y+1)
+            data = library.get(3, positions=coordinates[nlabels, 0], 
+                    period=period, increment=increment)
+
+            # Generated traffic forces are evaluated per time block, while
+            # the columns of a load case file are memory-mapped views
 
-            for j, nlabel in enumerate(nlabels):
+            if isinstance(data, loadcases.Traffic):
+                amplitudes = data.getFunctions()
+            else:
+                amplitudes = [(data[:, 0], force) for force in data[:, 1:].T]
 
-                amplitude = [np.array([time, forces[:, j]])]
-                model.Load(model1).addForce(nodes[nlabel].label, 'y', amplitude)
+            model.Load(model1).addForce(nlabels, 'y', amplitudes)
 
 
 
@@ -372,96 +718,65 @@ def submit(job, pipe=sys.stdout.write):
         dynamics = analysis.Dynamics(model1)
         dynamics.setTimePeriod(period)
         dynamics.setIncrementSize(increment)
-        dynamics.submit()
-
-        pipe('   Completed: analysis \n\n')
-
-        time = np.arange(0, period+increment, increment)
-        nmodes = dynamics.displacement.shape[0]
-
-        displacement = np.zeros((nmodes, time.size))
-        acceleration = np.zeros((nmodes, time.size))
+        dynamics.setIntegrationIncrement(step)
+        dynamics.setIntegrationMethod(method)
+        dynamics.setNumberOfModes(nmodes)
+        dynamics.setFrequencyCutoff(cutoff)
+        dynamics.setParticipationThreshold(participation, basis)
+        dynamics.setBlockSize(block)
+        dynamics.setEigenSolver(*job.getEigenSolver().values())
+        dynamics.initialize()
 
-        for m in range(nmodes):
+        pipe('   Modal basis cache: {Hits} hits, {Misses} misses \n'.format(
+                **analysis.Modal.statistics))
 
-            displacement[m, :] = np.interp(time, dynamics.time, dynamics.displacement[m, :])
-            acceleration[m, :] = np.interp(time, dynamics.time, dynamics.acceleration[m, :])
+        if dynamics.iterations is not None:
+            pipe('   Warm-started LOBPCG: {} iterations \n'.format(dynamics.iterations))
 
-        # Extract displacements and accelerations at output degrees of freedom
+        # Extract mode shapes of strains at output nodes, so that strains 
+        # are obtained from the modal displacements as a matrix product
 
-        displacements = dynamics.modes[odofs, :].dot(displacement).T
-        accelerations = dynamics.modes[odofs, :].dot(acceleration).T
+        smodes = soperator.dot(dynamics.modes)
+        omodes = dynamics.modes[odofs, :]
 
-        # Extract strains at output degrees of freedom
+        # Integrate the response in time blocks and write displacements, 
+        # accelerations and strains of each block at output locations
 
-        strains = np.zeros((time.size, len(olabels), 3)) # define time_steps
-        rcoords = [[1, 1], [1, -1], [-1, -1], [-1, 1]]
-
-        strain_history = np.zeros((time.size, 3))
-
-
-        for k, olabel in enumerate(olabels):
-            elabels = np.sort(nodes[olabel].links)
-
-            for elabel, (r1, r2) in zip(elabels, rcoords):
-
-                ncoords = elements[elabel].getNodeCoordinates()
-                ipoints = elements[elabel].getIntegrationPoints()
-
-                edofs = elements[elabel].getNodeDegreesOfFreedom()
-                disp = dynamics.modes[edofs, :].dot(displacement)# .T
-                element = elements[elabel].getType()
-
-                # 1. rows of disp contain element displacements
-                # 2. columns of disp should contain time steps
-
-                strain = element.getStrain(ncoords, disp, ipoints, r1, r2).T
+        pipe('   Started: writting output \n')
 
-                # 1. columns of strain contain components Exx, Eyy, Exy
-                # 2. rows of strain contain time steps
+        writer.setMetadata(time=dynamics.time)
+        size = len(dynamics.time)
 
-                strain_history += strain
+        labels = ['Node-{}-U{}'.format(label, dof) 
+                for label in olabels for dof in 'xy']
+        writer.open('displacements', (size, len(labels)), labels)
 
-            strains[:, k, :] = strain_history/len(nodes[olabel].links)
-            strain_history[:] = 0
+        labels = ['Node-{}-A{}'.format(label, dof) 
+                for label in olabels for dof in 'xy']
+        writer.open('accelerations', (size, len(labels)), labels)
 
-        strains = strains.reshape((time.size, len(olabels)*3))
+        labels = ['Node-{}-E{}'.format(label, dof) 
+                for label in olabels for dof in ['xx', 'yy', 'xy']]
+        writer.open('strains', (size, len(labels)), labels)
 
-        # Save results (displacements, accelerations and strains)
+        for time, displacement, velocity, acceleration in dynamics.iterate():
+            writer.append('displacements', omodes.dot(displacement).T)
+            writer.append('accelerations', omodes.dot(acceleration).T)
+            writer.append('strains', smodes.dot(displacement).T)
 
-        pipe('   Started: writting output \n')
-
-        labels = ''.join([
-            'Node-{}-Ux'.format(label).ljust(24, ' ')+
-            'Node-{}-Uy'.format(label).ljust(24, ' ') for label in olabels])
-        fname = jobName+'_displacements.dat'
-        np.savetxt(fname, displacements, fmt='% .16e', header=labels)
-
-        labels = ''.join([
-            'Node-{}-Ax'.format(label).ljust(24, ' ')+
-            'Node-{}-Ay'.format(label).ljust(24, ' ') for label in olabels])
-        fname = jobName+'_accelerations.dat'
-        np.savetxt(fname, accelerations, fmt='% .16e', header=labels)
-
-        labels = ''.join([
-            'Node-{}-Exx'.format(label).ljust(24, ' ')+
-            'Node-{}-Eyy'.format(label).ljust(24, ' ')+
-            'Node-{}-Exy'.format(label).ljust(24, ' ') for label in olabels])
-        fname = jobName+'_strains.dat'
-        np.savetxt(fname, strains, fmt='% .16e', header=labels)
+        writer.close()
 
+        pipe('   Completed: analysis \n')
         pipe('   Completed: writting output \n\n')
 
     elif jobAnalysis == 'Static':
 
-        nlabel = 63*(nel_y+1)-1
-
         # lcase = np.loadtxt('Load_case_2.dat', skiprows=1)
         # time, force = lcase[0, 0], lcase[1, 1]
         time = 30 # np.linspace(0, 30, 10000)
         force = 1e3
         amplitude = [np.array([time, force])]
-        model.Load(model1).addForce(nodes[nlabel].label, 'y', amplitude)
+        model.Load(model1).addForce(plabels[0], 'y', amplitude)
 
         # Define static analysis
 
@@ -479,41 +794,27 @@ def submit(job, pipe=sys.stdout.write):
 
         # Extract strains at output nodes
 
-        strains = np.zeros((len(olabels), 3))
-        rcoords = [[1, 1], [1, -1], [-1, -1], [-1, 1]]
-
-        for k, olabel in enumerate(olabels):
-            elabels = np.sort(nodes[olabel].links)
-
-            for elabel, (r1, r2) in zip(elabels, rcoords):
-                ncoords = elements[elabel].getNodeCoordinates()
-                ipoints = elements[elabel].getIntegrationPoints()
-
-                edofs = elements[elabel].getNodeDegreesOfFreedom()
-                disp = static.displacement[edofs]
-                element = elements[elabel].getType()
-
-                strain = element.getStrain(ncoords, disp, ipoints, r1, r2)
-                nodes[olabel].strain += strain
-
-            strains[k, :] = nodes[olabel].strain
-
-        strains = strains.reshape((1, strains.size))
+        strains = soperator.dot(static.displacement).T
 
         # Save results
 
-        labels = ''.join([
-            'Node-{}-Exx'.format(label).ljust(24, ' ')+
-            'Node-{}-Eyy'.format(label).ljust(24, ' ')+
-            'Node-{}-Exy'.format(label).ljust(24, ' ') for label in olabels])
-
         pipe('   Started: writting output\n')
 
-        np.savetxt(jobName+'_displacements.dat', displacements, header=labels)
-        np.savetxt(jobName+'_strains.dat', strains, fmt='% .16e', header=labels)
+        labels = ['Node-{}-U{}'.format(label, dof) 
+                for label in olabels for dof in 'xy']
+        writer.write('displacements', displacements, labels, fmt='%.18e')
+
+        labels = ['Node-{}-E{}'.format(label, dof) 
+                for label in olabels for dof in ['xx', 'yy', 'xy']]
+        writer.write('strains', strains, labels)
+
+        writer.close()
 
         pipe('   Completed: writting output\n')
 
+    if key is not None and entry is None:
+        resultCache.put(key, writer.writers[1])
+
 
     pipe('   Completed \n')
     pipe('   {}\n'.format(tm.ctime()))
@@ -578,6 +879,169 @@ def submit(job, pipe=sys.stdout.write):
 
 
 
+def runJob(item):
+
+    """
+    Submit a job of a batch, isolating any error and collecting the progress
+    messages.
+
+    Parameters
+    ----------
+    item: tuple
+        The index of the job in the batch and the job.
+
+    Returns
+    -------
+    result: dict
+        The index, name, error traceback (None if completed), wall time and
+        progress messages of the job.
+    """
+
+    index, job = item
+    messages = []
+    start = tm.time()
+
+    try:
+        submit(job, messages.append)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+
+    result = {'Index': index, 'Name': job.getName(), 'Error': error, 
+            'Time': tm.time()-start, 'Messages': ''.join(messages)}
+
+    return result
+
+
+def shareMeshes(shared):
+
+    """ Specify the meshes shared among the jobs of a worker process. """
+
+    for arrays in shared.values():
+        for array in arrays:
+            array.flags.writeable = False
+
+    meshes.update(shared)
+
+
+def initializeWorker(shared, cacheSize):
+
+    """ Share the meshes with a worker process and enable its result cache. """
+
+    shareMeshes(shared)
+
+    if cacheSize > 0:
+        cache.setCache(size=cacheSize)
+
+
+def submitMany(jobs, workers=None, pipe=sys.stdout.write, cacheSize=0):
+
+    """
+    Submit a batch of jobs to a pool of worker processes. The meshes of the
+    jobs are computed once and passed to each worker when it starts, while
+    the output files of each job are named after the job. An error in a job
+    is reported without interrupting the rest of the batch.
+
+    Parameters
+    ----------
+    jobs: list or iterator
+        The front2back.BackendJob instances, with unique names. An iterator,
+        e.g., a parameter sweep, is consumed lazily, in which case only the
+        mesh of its first job is shared in advance and the name uniqueness
+        is not verified.
+    workers: int, positive, optional
+        The number of worker processes. If not specified, the number of 
+        processors is used. A single worker runs the jobs in the calling
+        process.
+    pipe: function
+        The function to pipe progress messages.
+    cacheSize: int, optional
+        The size limit in bytes of the result cache, e.g., 2**31, so that
+        the results of jobs already computed are written from the cache.
+        By default the results are not cached.
+
+    Returns
+    -------
+    results: list
+        The results of the jobs, as returned by runJob, in order of jobs.
+
+    Raises
+    ------
+    ValueError
+        If the names of a list of jobs are not unique.
+    """
+
+    if isinstance(jobs, (list, tuple)):
+        names = [job.getName() for job in jobs]
+        total = len(jobs)
+
+        if len(set(names)) < len(names):
+            duplicates = sorted(set(name for name in names if names.count(name) > 1))
+            raise ValueError('Job names must be unique: {}.'.format(', '.join(duplicates)))
+
+        sample = jobs
+    else:
+        jobs = iter(jobs)
+        sample = [job for job in it.islice(jobs, 1)]
+        jobs = it.chain(sample, jobs)
+        total = '?'
+
+    # Compute the meshes of the jobs once
+
+    shared = {}
+
+    for job in sample:
+        nel_x, nel_y, numbering = job.getMesh().values()
+        args = (sum(spans), height, height, nel_x, nel_y)
+        shared[args] = getSharedMesh(*args)
+
+    workers = workers or multiprocessing.cpu_count()
+    pipe(' Submitted {} jobs to {} workers\n'.format(total, workers))
+
+    pool = None
+    previous = cache.getCache()
+    start = tm.time()
+    results = {}
+
+    if workers == 1:
+        if cacheSize > 0:
+            cache.setCache(size=cacheSize)
+
+        iterator = map(runJob, enumerate(jobs))
+    else:
+        pool = multiprocessing.Pool(workers, initializer=initializeWorker, 
+                initargs=(shared, cacheSize))
+        iterator = pool.imap_unordered(runJob, enumerate(jobs))
+
+    try:
+        for count, result in enumerate(iterator, 1):
+            results[result['Index']] = result
+
+            status = 'failed' if result['Error'] else 'completed'
+            rate = count/max(tm.time()-start, 1e-6)*60
+
+            message = ' Job {} {} in {:.1f} s ({}/{}, {:.1f} jobs/min)\n'
+            pipe(message.format(result['Name'], status, result['Time'], count, 
+                    total, rate))
+    finally:
+        if workers == 1 and cacheSize > 0:
+            cache.setCache(previous.folder, previous.size)
+
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    results = [results[index] for index in sorted(results)]
+    failed = sum(result['Error'] is not None for result in results)
+    elapsed = max(tm.time()-start, 1e-6)
+
+    message = ' Completed {} jobs ({} failed) in {:.1f} s, {:.1f} jobs/min\n'
+    pipe(message.format(len(results), failed, elapsed, len(results)/elapsed*60))
+
+    return results
+
+
+
 if __name__ == '__main__':
     job = front2back.BackendJob('Job-1')
 
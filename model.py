@@ -7,30 +7,322 @@ import numpy as np
 import scipy as sp
 import itertools as it
 import scipy.sparse as sps
+import scipy.sparse.csgraph as csgraph
 import matplotlib.pyplot as plt
 import multiprocessing
 import abc
 import time
+import hashlib
+import material as mat
+
+
+class Mesh:
+
+    """
+    Class for the array storage of the model nodes. Coordinates, active and
+    constrained degrees of freedom, their numeration and the links to 
+    elements are held in contiguous arrays, while nodal states, i.e., 
+    displacements, velocities, accelerations and strains, are allocated on
+    first access. Node instances are thin views of a single row.
+
+    Parameters
+    ----------
+    coordinates: ndarray
+        The node coordinates (n x 2) or (n x 3), where n is the number of 
+        nodes.
+
+    Attributes
+    ----------
+    coords: ndarray
+        The node coordinates (n x 3).
+    adof: ndarray
+        The active degrees of freedom (n x 6).
+    cdof: ndarray
+        The constrained degrees of freedom (n x 6).
+    ndof: ndarray
+        The numeration of degrees of freedom (n x 6), -1 when inactive.
+
+    Methods
+    -------
+    fromNodes(nodes)
+        Gather standalone nodes into a mesh.
+    getNode(index)
+        Get a node view.
+    getState(name)
+        Get a nodal state array.
+    setLinks(connectivity, labels)
+        Specify the links of nodes to elements.
+    getLinks(index)
+        Get the labels of the elements linked to a node.
+    """
+
+    states = {'dsp': 6, 'vlc': 6, 'acl': 6, 'strain': 3}
+
+    def __init__(self, coordinates):
+
+        coordinates = np.atleast_2d(np.asarray(coordinates, dtype=float))
+        n = coordinates.shape[0]
+
+        self.coords = np.zeros((n, 3))
+        self.coords[:, :coordinates.shape[1]] = coordinates
+
+        self.adof = np.zeros((n, 6), dtype=bool)
+        self.cdof = np.zeros((n, 6), dtype=bool)
+        self.ndof = np.full((n, 6), -1, dtype=np.int32)
+
+        self.state = {}
+        self.offsets = np.zeros(n+1, dtype=np.int32)
+        self.links = np.zeros(0, dtype=np.int32)
+
+
+    def __len__(self):
+        return self.coords.shape[0]
+
+
+    @classmethod
+    def fromNodes(cls, nodes):
+
+        """
+        Gather a list of nodes into a single mesh and rebind each node as a
+        view of the corresponding row.
+
+        Parameters
+        ----------
+        nodes: list
+            The nodes.
+
+        Returns
+        -------
+        mesh: Mesh
+            The mesh.
+        """
+
+        mesh = cls(np.array([node.coords for node in nodes]).reshape((-1, 3)))
+
+        for name in ['adof', 'cdof', 'ndof']:
+            getattr(mesh, name)[:] = [getattr(node, name) for node in nodes]
+
+        for name in cls.states:
+            if any(name in node.mesh.state for node in nodes):
+                mesh.getState(name)[:] = [node.mesh.getState(name)[node.index]
+                        for node in nodes]
+
+        links = [node.links for node in nodes]
+        mesh.offsets[1:] = np.cumsum([len(link) for link in links])
+        mesh.links = np.array([label for link in links for label in link], dtype=np.int32)
+
+        for index, node in enumerate(nodes):
+            node.mesh, node.index = mesh, index
+
+        return mesh
+
+
+    def getNode(self, index):
+
+        """ Get the node view of the specified row. """
+
+        node = Node.__new__(Node)
+        node.mesh, node.index, node.label = self, index, index
+
+        return node
+
+
+    def getState(self, name):
+
+        """ Get the nodal state array (n x k) with the specified name. """
+
+        if name not in self.state:
+            self.state[name] = np.zeros((len(self), self.states[name]))
+
+        return self.state[name]
+
+
+    def setLinks(self, connectivity, labels):
+
+        """
+        Specify the links of nodes to elements, sorted by element label.
+
+        Parameters
+        ----------
+        connectivity: ndarray
+            The node labels of the element nodes, flattened.
+        labels: ndarray
+            The corresponding element labels.
+        """
+
+        order = np.lexsort((labels, connectivity))
+        counts = np.bincount(connectivity, minlength=len(self))
+
+        self.offsets = np.hstack(([0], np.cumsum(counts))).astype(np.int32)
+        self.links = np.asarray(labels, dtype=np.int32)[order]
+
+
+    def getLinks(self, index):
+
+        """ Get the labels of the elements linked to the specified node. """
+
+        return self.links[self.offsets[index]:self.offsets[index+1]].tolist()
+
+
+    def addLink(self, index, label):
+
+        """ Link the specified node to an element. """
+
+        self.links = np.insert(self.links, self.offsets[index+1], label)
+        self.offsets[index+1:] += 1
+
+
+
+class Nodes:
+
+    """
+    Class for the lazy sequence of the nodes of a model defined by a mesh.
+    The Node views are created on access.
+    """
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+
+
+    def __len__(self):
+        return len(self.mesh)
+
+
+    def __getitem__(self, label):
+
+        if isinstance(label, slice):
+            return [self[j] for j in range(*label.indices(len(self)))]
+
+        label = int(label)
+
+        if label < 0:
+            label += len(self)
+
+        if not 0 <= label < len(self):
+            raise IndexError('Node label out of range.')
+
+        return self.mesh.getNode(label)
+
+
+    def __iter__(self):
+        for label in range(len(self)):
+            yield self[label]
+
+
+
+class DegreesOfFreedom:
+
+    """
+    Class for the mapping of (node label, degree of freedom) pairs to the 
+    numeration of degrees of freedom, backed by the mesh arrays. The 
+    mapping reflects the current constraints of the mesh.
+
+    Parameters
+    ----------
+    mesh: Mesh
+        The model mesh.
+    kind: {'all', 'free', 'restrained'}
+        The degrees of freedom included in the mapping.
+    """
+
+    def __init__(self, mesh, kind):
+        self.mesh = mesh
+        self.kind = kind
+
+
+    def getMask(self):
+
+        """ Get the mask (n x 6) of the included degrees of freedom. """
+
+        if self.kind == 'all':
+            return self.mesh.adof
+        elif self.kind == 'free':
+            return self.mesh.adof & ~self.mesh.cdof
+        else:
+            return self.mesh.adof & self.mesh.cdof
+
+
+    def getArrays(self):
+
+        """ 
+        Get the node labels, degrees of freedom and numbers of the included
+        degrees of freedom, sorted by number.
+        """
+
+        labels, dofs = np.nonzero(self.getMask())
+        numbers = self.mesh.ndof[labels, dofs].astype(int)
+        order = np.argsort(numbers, kind='stable')
+
+        return labels[order], dofs[order], numbers[order]
+
+
+    def __len__(self):
+        return int(np.count_nonzero(self.getMask()))
+
+
+    def __contains__(self, key):
+        label, dof = key
+        return 0 <= label < len(self.mesh) and bool(self.getMask()[label, dof])
+
+
+    def __getitem__(self, key):
+
+        if key not in self:
+            raise KeyError(key)
+
+        return int(self.mesh.ndof[key])
+
+
+    def __iter__(self):
+        return iter(self.keys())
+
+
+    def keys(self):
+        labels, dofs, numbers = self.getArrays()
+        return list(zip(labels.tolist(), dofs.tolist()))
+
+
+    def values(self):
+        return self.getArrays()[2]
+
+
+    def items(self):
+        return list(zip(self.keys(), self.values().tolist()))
+
 
 
 class Node:
 
+    """
+    Class for a model node, implemented as a view of a row of a mesh. 
+    Standalone nodes are backed by a mesh of a single node, until gathered
+    into the mesh of a model.
+    """
+
+    __slots__ = ('mesh', 'index', 'label')
+
     dictionary = {'x':0, 'y':1, 'z':2, 'rx':3, 'ry':4, 'rz':5}
 
     def __init__(self, coordinates):
         self.label = np.nan
+        self.mesh = Mesh(np.reshape(coordinates, (1, -1)))
+        self.index = 0
 
-        self.links = []
-        self.coords = np.array(coordinates)
-        self.dsp = np.zeros((6, 1))
-        self.vlc = np.zeros((6, 1))
-        self.acl = np.zeros((6, 1))
 
-        self.strain = np.zeros(3)
+    coords = property(lambda self: self.mesh.coords[self.index])
+    adof = property(lambda self: self.mesh.adof[self.index])
+    cdof = property(lambda self: self.mesh.cdof[self.index])
+    ndof = property(lambda self: self.mesh.ndof[self.index])
+    links = property(lambda self: self.mesh.getLinks(self.index))
 
-        self.adof = np.ones(6)*False
-        self.cdof = np.ones(6)*False
-        self.ndof = np.ones(6)*np.nan
+    dsp = property(lambda self: self.mesh.getState('dsp')[self.index][:, np.newaxis])
+    vlc = property(lambda self: self.mesh.getState('vlc')[self.index][:, np.newaxis])
+    acl = property(lambda self: self.mesh.getState('acl')[self.index][:, np.newaxis])
+    strain = property(lambda self: self.mesh.getState('strain')[self.index])
+
+    @strain.setter
+    def strain(self, value):
+        self.mesh.getState('strain')[self.index] = value
 
 
     def __str__(self):
@@ -57,7 +349,7 @@ class Node:
 
 
     def addLink(self, elementLabel):
-        self.links.append(elementLabel)
+        self.mesh.addLink(self.index, elementLabel)
 
 
     def setRestraint(self, dof):
@@ -68,19 +360,21 @@ class Node:
         if String == 'A':
             String = self.dictionary.keys()
         for i, j in enumerate(String):
-            self.__dict__[Name][self.dictionary[j]] = Value[i]
+            getattr(self, Name)[self.dictionary[j]] = Value[i]
 
 
     def AddValue(self, Name, String, Value):
         if String == 'A':
             String = self.dictionary.keys()
         for i, j in enumerate(String):
-            self.__dict__[Name][self.dictionary[j]] += Value[i]
+            getattr(self, Name)[self.dictionary[j]] += Value[i]
 
 
 
 class Element:
 
+    __slots__ = ('label', 'nodes', 'type', 'material', 'thickness', 'irule')
+
     def __init__(self, nodes, element, material, thickness, irule):
         self.label = None
         self.nodes = nodes
@@ -121,10 +415,43 @@ class Element:
         return self.type
 
 
+    def getMaterialProperties(self):
+
+        if isinstance(self.material, list):
+            properties = [[m.E, m.n, m.rho] for m in self.material]
+            properties = np.array(properties, dtype=float).T
+        else:
+            properties = [self.material.E, self.material.n, self.material.rho]
+            properties = np.array([np.broadcast_to(item, len(self.irule)) 
+                    for item in properties], dtype=float)
+
+        return properties
+
+
+    def getConstitutiveMatrices(self):
+
+        if isinstance(self.material, list):
+            cmatrix = np.array([material.C for material in self.material])
+        else:
+            cmatrix = np.broadcast_to(self.material.C, (len(self.irule), 3, 3))
+
+        return cmatrix
+
+
+    def getDensities(self):
+
+        if isinstance(self.material, list):
+            densities = np.array([material.rho for material in self.material])
+        else:
+            densities = np.broadcast_to(self.material.rho, len(self.irule))
+
+        return densities
+
+
     def getStiffness(self):
         
-        ncoords = np.array([node.coords[:2] for node in self.nodes])
-        cmatrix = np.array([material.C for material in self.material])
+        ncoords = self.getNodeCoordinates()
+        cmatrix = self.getConstitutiveMatrices()
         thickness, irule = self.thickness, self.irule
 
         stiffness = self.type.getStiffness(ncoords, cmatrix, thickness, irule)
@@ -134,8 +461,8 @@ class Element:
 
     def getMass(self):
 
-        ncoords = np.array([node.coords[:2] for node in self.nodes])
-        densities = np.array([material.rho for material in self.material])
+        ncoords = self.getNodeCoordinates()
+        densities = self.getDensities()
         thickness, irule = self.thickness, self.irule
 
         mass = self.type.getMass(ncoords, densities, thickness, irule)
@@ -177,6 +504,151 @@ class Element:
 
 
 
+class ElementGroup:
+
+    """
+    Class for a group of elements of the same type and integration rule,
+    whose topology and properties are stored as arrays, so that the group 
+    can be processed as a single batch.
+
+    Parameters
+    ----------
+    connectivity: ndarray
+        The node labels (e x n) of each element, where e is the number of 
+        elements and n the number of element nodes.
+    element: Quadrilateral
+        The element type.
+    material: LinearElastic
+        The material, with properties broadcastable to (e x p), where p is
+        the number of integration points.
+    thickness: ndarray
+        The element thickness, broadcastable to (e x p).
+    irule: ndarray
+        The integration rule (p x 4).
+
+    Attributes
+    ----------
+    cmatrix: ndarray
+        The material constitutive matrices (e x p x 3 x 3).
+    density: ndarray
+        The material densities (e x p).
+    """
+
+    def __init__(self, connectivity, element, material, thickness, irule):
+        self.connectivity = np.asarray(connectivity, dtype=int)
+        self.type = element
+        self.material = material
+        self.irule = irule
+
+        shape = (self.connectivity.shape[0], irule.shape[0])
+        self.thickness = np.broadcast_to(thickness, shape)
+        self.cmatrix = np.broadcast_to(material.C, shape+(3, 3))
+        self.density = np.broadcast_to(material.rho, shape)
+
+
+    def __len__(self):
+        return self.connectivity.shape[0]
+
+
+    @classmethod
+    def fromElements(cls, elements, labels):
+
+        """
+        Get the group of a list of elements of the same type and integration
+        rule, with materials specified at each integration point.
+
+        Parameters
+        ----------
+        elements: list
+            The elements.
+        labels: dict
+            The node labels, keyed by node identity.
+
+        Returns
+        -------
+        group: ElementGroup
+            The element group.
+        """
+
+        connectivity = [[labels[id(node)] for node in elm.nodes] for elm in elements]
+        properties = np.array([elm.getMaterialProperties() for elm in elements])
+        thickness = np.array([np.broadcast_to(elm.thickness, len(elm.irule)) 
+                for elm in elements])
+
+        material = mat.LinearElastic(*properties.transpose((1, 0, 2)))
+        group = cls(connectivity, elements[0].type, material, thickness, 
+                elements[0].irule)
+
+        return group
+
+
+    def getElement(self, index, nodes):
+
+        """
+        Get an element of the group as an Element instance.
+
+        Parameters
+        ----------
+        index: int
+            The index of the element in the group.
+        nodes: list
+            The model nodes.
+
+        Returns
+        -------
+        element: Element
+            The element.
+        """
+
+        enodes = [nodes[label] for label in self.connectivity[index]]
+        material = self.material[index] if np.ndim(self.material.E) else self.material
+
+        return Element(enodes, self.type, material, self.thickness[index], self.irule)
+
+
+
+class Elements:
+
+    """
+    Class for the lazy sequence of the elements of a model defined by 
+    element groups. The Element instances are created on access.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.offsets = np.cumsum([0]+[len(group) for group in model.groups])
+
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+
+    def __getitem__(self, label):
+
+        if isinstance(label, slice):
+            return [self[j] for j in range(*label.indices(len(self)))]
+
+        label = int(label)
+
+        if label < 0:
+            label += len(self)
+
+        if not 0 <= label < len(self):
+            raise IndexError('Element label out of range.')
+
+        g = np.searchsorted(self.offsets, label, side='right')-1
+        element = self.model.groups[g].getElement(label-self.offsets[g], self.model.nodes)
+        element.label = label
+
+        return element
+
+
+    def __iter__(self):
+        for label in range(len(self)):
+            yield self[label]
+
+
+
 class Load:
 
     def __init__(self, model):
@@ -184,24 +656,59 @@ class Load:
     
     def addForce(self, labels, dofs, functions):
 
+        """
+        Add nodal forces to the model. Any number of nodes can be loaded in 
+        a single call, while forces on restrained degrees of freedom are 
+        ignored.
+
+        Parameters
+        ----------
+        labels: int, list or ndarray
+            The labels of the loaded nodes.
+        dofs: str or list
+            The loaded degrees of freedom, e.g. 'y' or ['x', 'y'].
+        functions: list
+            The load functions, as arrays (2 x t) of time instants and 
+            values, or, for dynamic analysis, as functions returning the 
+            values at given time instants. Either a single function, shared by all nodes and 
+            degrees of freedom, one function for each degree of freedom, 
+            shared by all nodes, or one function for each node and degree
+            of freedom, in order of nodes.
+
+        Raises
+        ------
+        ValueError
+            If the number of functions matches none of the above.
+        """
+
         model = self.model
         dic = Node.dictionary
 
-        labels = [labels] if not isinstance(labels, list) else labels
+        labels = np.atleast_1d(np.asarray(labels, dtype=int))
         dofs = [dofs] if not isinstance(dofs, list) else dofs
+        dofs = np.array([dic[dof] for dof in dofs], dtype=int)
 
-        for label in labels:
-            node = model.nodes[label]
-            for dof, function in zip(dofs, functions):
-                if node.ndof[dic[dof]] in model.rdof.values():
-                    continue
-                else:
-                    model.loads.append(function)
-                    model.ldof[(label, dic[dof])] = int(node.ndof[dic[dof]])
+        number = len(labels)*len(dofs)
+
+        if len(functions) == 1:
+            functions = list(functions)*number
+        elif len(functions) == len(dofs):
+            functions = list(functions)*len(labels)
+        elif len(functions) != number:
+            accepted = ', '.join(str(item) for item in sorted({1, len(dofs), number}))
+            error = 'Number of load functions must be one of {}, not {}.'
+            raise ValueError(error.format(accepted, len(functions)))
+
+        labels, dofs = np.repeat(labels, len(dofs)), np.tile(dofs, len(labels))
+        loaded = ~model.rdof.getMask()[labels, dofs]
+
+        numbers = model.mesh.ndof[labels, dofs][loaded].astype(int)
+        keys = zip(labels[loaded].tolist(), dofs[loaded].tolist())
 
-        model.Sp = np.zeros((len(model.ndof), len(model.ldof)))
-        model.Sp[list(model.ldof.values()), range(len(model.ldof))] = 1
-        model.Sp = model.Sp[list(model.fdof.values())]
+        model.loads.extend(function for function, load 
+                in zip(functions, loaded) if load)
+        model.ldof.update(zip(keys, numbers.tolist()))
+        model.operator = None
 
 
     def addDisplacement(self, labels, dofs, value):
@@ -229,100 +736,355 @@ class Constraint:
         self.model = model
     
     def addFixation(self, labels, dofs):
+
+        """
+        Restrain the specified degrees of freedom of any number of nodes.
+
+        Parameters
+        ----------
+        labels: int, list or ndarray
+            The labels of the restrained nodes.
+        dofs: str or list
+            The restrained degrees of freedom, e.g. 'x' or ['x', 'y'].
+        """
+
         model = self.model
         dic = Node.dictionary
 
-        labels = [labels] if not isinstance(labels, list) else labels
+        labels = np.atleast_1d(np.asarray(labels, dtype=int))
         dofs = [dofs] if not isinstance(dofs, list) else dofs
+        dofs = np.array([dic[dof] for dof in dofs], dtype=int)
 
-        for label in labels:
-            node = model.nodes[label]
+        model.mesh.cdof[np.ix_(labels, dofs)] = True
 
-            for dof in dofs:
-                if node.ndof[dic[dof]] in model.rdof.values():
-                    continue
-                else:
-                    node.cdof[dic[dof]] = True
-                    model.rdof[(label, dic[dof])] = int(node.ndof[dic[dof]])
-                    model.fdof.pop((label, dic[dof]))
-
-        model.Sp = model.Sp[list(model.fdof.values())]
+        model.partition = None
+        model.operator = None
 
 
     def addSpring(self, labels, dofs, values):
 
-        labels = [labels] if not isinstance(labels, list) else labels
-        dofs = [dofs] if not isinstance(dofs, list) else dofs
+        """
+        Add nodal springs to any number of nodes.
 
-        dic = Node.dictionary
-
-        for label in labels:
-            node = self.model.nodes[label]
+        Parameters
+        ----------
+        labels: int, list or ndarray
+            The labels of the nodes.
+        dofs: str or list
+            The degrees of freedom of the springs, e.g. 'x' or ['x', 'y'].
+        values: list
+            The spring stiffness for each degree of freedom, shared by all
+            nodes.
+        """
 
-            for dof, value in zip(dofs, values):
-                self.model.springs[0].append(label)
-                self.model.springs[1].append(dic[dof])
-                self.model.springs[2].append(int(node.ndof[dic[dof]]))
-                self.model.springs[3].append(value)
+        self.addDiagonal(self.model.springs, labels, dofs, values)
 
 
     def addMass(self, labels, dofs, value):
 
-        labels = [labels] if not isinstance(labels, list) else labels
+        """
+        Add nodal masses to any number of nodes.
+
+        Parameters
+        ----------
+        labels: int, list or ndarray
+            The labels of the nodes.
+        dofs: str or list
+            The degrees of freedom of the masses, e.g. 'x' or ['x', 'y'].
+        value: float
+            The mass, shared by all nodes and degrees of freedom.
+        """
+
         dofs = [dofs] if not isinstance(dofs, list) else dofs
+        self.addDiagonal(self.model.masses, labels, dofs, [value]*len(dofs))
+
+
+    def addDiagonal(self, entries, labels, dofs, values):
+
+        """ Append diagonal entries at the specified nodes and degrees of freedom. """
 
         dic = Node.dictionary
 
-        for label in labels:
-            node = self.model.nodes[label]
+        labels = np.atleast_1d(np.asarray(labels, dtype=int))
+        dofs = [dofs] if not isinstance(dofs, list) else dofs
+        dofs = np.array([dic[dof] for dof in dofs], dtype=int)
 
-            for dof in dofs:
-                self.model.masses[0].append(label)
-                self.model.masses[1].append(dic[dof])
-                self.model.masses[2].append(int(node.ndof[dic[dof]]))
-                self.model.masses[3].append(value)
+        values = np.tile(values, len(labels))
+        labels, dofs = np.repeat(labels, len(dofs)), np.tile(dofs, len(labels))
+
+        entries[0].extend(labels.tolist())
+        entries[1].extend(dofs.tolist())
+        entries[2].extend(self.model.mesh.ndof[labels, dofs].astype(int).tolist())
+        entries[3].extend(values.tolist())
 
 
 
 
 class Model:
     
-    def __init__(self, nodes=[], elements=[]):
-        self.nodes = nodes
+    def __init__(self, nodes=[], elements=[], groups=[]):
+
+        if isinstance(nodes, Mesh):
+            self.mesh = nodes
+            self.nodes = Nodes(self.mesh)
+        else:
+            self.mesh = Mesh.fromNodes(nodes)
+            self.nodes = nodes
+
+            for label, node in enumerate(self.nodes):
+                node.label = label
+
         self.elements = elements
+        self.groups = list(groups)
         
-        self.ndof = OrderedDict()
-        self.rdof = OrderedDict()
-        self.fdof = OrderedDict()
+        self.ndof = DegreesOfFreedom(self.mesh, 'all')
+        self.rdof = DegreesOfFreedom(self.mesh, 'restrained')
+        self.fdof = DegreesOfFreedom(self.mesh, 'free')
         self.ldof = OrderedDict()
         
         self.loads = []
 
         self.springs = [[], [], [], []]
         self.masses = [[], [], [], []]
-    
-        elementCounter = it.count(0)
-        nodeCounter = it.count(0)
-        dofCounter = it.count(0)
-        
-        for element in self.elements:
-            element.label = next(elementCounter)
 
-            for node in element.nodes:
-                node.addLink(element.label)
+        if self.elements:
+            labels = {id(node): node.label for node in self.nodes}
+            groups = OrderedDict()
 
-        for node in self.nodes:
-            node.label = next(nodeCounter)
+            for label, element in enumerate(self.elements):
+                element.label = label
+                key = (type(element.type), element.irule.tobytes())
+                groups.setdefault(key, []).append(element)
 
-            for dof in np.flatnonzero(node.adof):
-                num = next(dofCounter)
-                node.ndof[dof] = num
-                self.ndof[(node.label, dof)] = num
-                self.fdof[(node.label, dof)] = num
+            self.groups = [ElementGroup.fromElements(elements, labels) 
+                    for elements in groups.values()]
+        else:
+            self.elements = Elements(self)
+
+        # Link nodes to elements in ascending order of element labels
+
+        if self.groups:
+            connectivity = np.hstack([group.connectivity.ravel() for group in self.groups])
+            elabels = np.hstack([np.repeat(np.arange(len(group)), group.connectivity.shape[1])
+                    +offset for group, offset in zip(self.groups, self.getOffsets())])
+            self.mesh.setLinks(connectivity, elabels)
 
-        self.Sp = np.zeros((len(self.fdof), len(self.ldof)))
+        # Number active degrees of freedom in order of nodes
+
+        self.mesh.ndof[:] = -1
+        self.mesh.ndof[self.mesh.adof] = np.arange(np.count_nonzero(self.mesh.adof))
 
         self.constraints = Constraint(self)
+        self.numbering = 'Natural'
+        self.matrices = {}
+        self.key = None
+        self.pattern = None
+        self.partition = None
+        self.operator = None
+
+
+    Sp = property(lambda self: self.getLoadOperator())
+
+
+    def getElementGroups(self):
+
+        """ 
+        Get the model element groups, each containing elements of the same 
+        type and integration rule, so that each group can be processed as a 
+        single batch. Groups are gathered when the model is initialized.
+        """
+
+        return self.groups
+
+
+    def getOffsets(self):
+
+        """ Get the label of the first element of each element group. """
+
+        return np.cumsum([0]+[len(group) for group in self.groups])[:-1]
+
+
+    def getNodeCoordinates(self):
+
+        """ Get the in-plane coordinates of the model nodes (n x 2). """
+
+        return self.mesh.coords[:, :2]
+
+
+    def getNodeDegreesOfFreedom(self):
+
+        """ Get the in-plane degrees of freedom of the model nodes (n x 2). """
+
+        return self.mesh.ndof[:, :2]
+
+
+    def getPartition(self):
+
+        """
+        Get the free and restrained degrees of freedom as integer arrays, 
+        together with the permutation placing the free degrees of freedom 
+        first.
+        """
+
+        if self.partition is None:
+            fdof = self.fdof.values()
+            rdof = self.rdof.values()
+            self.partition = (fdof, rdof, np.hstack((fdof, rdof)))
+
+        return self.partition
+
+
+    def renumber(self, method='RCM'):
+
+        """
+        Renumber the degrees of freedom to reduce the bandwidth of the 
+        system matrices, and thereby the fill-in of their factorizations.
+        Nodes are reordered and the degrees of freedom of each node are 
+        kept consecutive. Springs, masses and loads already specified are
+        renumbered consistently, while cached patterns, partitions and 
+        operators are discarded.
+
+        Parameters
+        ----------
+        method: {'RCM', 'Natural'}
+            The numbering method, i.e., the reverse Cuthill-McKee ordering
+            of the node adjacency graph or the order of nodes. RCM is 
+            useful for unstructured numbering, whereas structured meshes
+            numbered along their shorter dimension are already banded.
+
+        Raises
+        ------
+        TypeError
+            If an invalid numbering method is specified.
+        """
+
+        if method.lower() not in ['rcm', 'natural']:
+            error = 'Numbering method must be either "{}" or "{}".'
+            raise TypeError(error.format('RCM', 'Natural'))
+
+        mesh, n = self.mesh, len(self.mesh)
+
+        if method.lower() == 'rcm' and self.groups:
+            connectivity = [group.connectivity for group in self.groups]
+            rows = np.hstack([np.repeat(item, item.shape[1], axis=1).ravel() 
+                    for item in connectivity])
+            cols = np.hstack([np.tile(item, item.shape[1]).ravel() 
+                    for item in connectivity])
+
+            graph = sps.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+            order = csgraph.reverse_cuthill_mckee(graph, symmetric_mode=True)
+        else:
+            order = np.arange(n)
+
+        active = mesh.adof[order]
+        numbers = np.full((n, 6), -1, dtype=np.int32)
+        numbers[active] = np.arange(np.count_nonzero(active))
+        mesh.ndof[order] = numbers
+
+        for entries in [self.springs, self.masses]:
+            labels, dofs = np.array(entries[0], dtype=int), np.array(entries[1], dtype=int)
+            entries[2] = mesh.ndof[labels, dofs].astype(int).tolist()
+
+        self.ldof = OrderedDict((key, int(mesh.ndof[key])) for key in self.ldof)
+
+        self.numbering = 'RCM' if method.lower() == 'rcm' else 'Natural'
+        self.matrices = {}
+        self.key = None
+        self.pattern = None
+        self.partition = None
+        self.operator = None
+
+
+    def getLoadDegreesOfFreedom(self):
+
+        """ 
+        Get the degree of freedom of each model load, in order of loads, so
+        that nodal forces are gathered and scattered by direct indexing.
+        """
+
+        return np.array(list(self.ldof.values()), dtype=int)
+
+
+    def getLoadOperator(self):
+
+        """
+        Get the sparse operator (f x l) distributing the model loads to the
+        free degrees of freedom, where f is the number of free degrees of 
+        freedom and l the number of loads. The operator is built once, after
+        all loads and constraints are specified.
+        """
+
+        if self.operator is None:
+            fdof, rdof, permutation = self.getPartition()
+            numbers = self.getLoadDegreesOfFreedom()
+
+            rows = np.searchsorted(fdof, numbers)
+            cols = np.arange(len(numbers))
+            free = rows < len(fdof)
+            free[free] = fdof[rows[free]] == numbers[free]
+
+            self.operator = sps.csr_matrix(
+                    (np.ones(np.count_nonzero(free)), (rows[free], cols[free])), 
+                    shape=(len(fdof), len(numbers)))
+
+        return self.operator
+
+
+    def getPattern(self):
+
+        """ 
+        Get the sparsity pattern of the system matrices. The pattern depends
+        only on the mesh topology and is shared among models with identical
+        element degrees of freedom.
+        """
+
+        if self.pattern is None:
+            ndof = self.getNodeDegreesOfFreedom()
+            dofs = [ndof[group.connectivity].reshape((len(group), -1)).astype(int)
+                    for group in self.getElementGroups()]
+            self.pattern = Pattern.fromDegreesOfFreedom(dofs, len(self.ndof))
+
+        return self.pattern
+
+
+    def setMatrices(self, stiffness=None, mass=None):
+
+        """
+        Specify system matrices assembled beforehand, e.g., read from a 
+        result cache, which are then used by assemble instead of traversing
+        the elements. The matrices must conform to the current numbering of
+        degrees of freedom, springs and masses, and are discarded when the 
+        model is renumbered.
+
+        Parameters
+        ----------
+        stiffness: csr_matrix, optional
+            The full stiffness matrix.
+        mass: csr_matrix, optional
+            The full mass matrix.
+        """
+
+        for name, matrix in [('stiffness', stiffness), ('mass', mass)]:
+            if matrix is not None:
+                self.matrices[name] = matrix
+
+
+    def setKey(self, key):
+
+        """
+        Specify the key of the structural state of the model, i.e., of the
+        parameters determining its stiffness and mass, by which modal 
+        analyses of models in the same state share their results. The key 
+        must be specified once the model is complete and is discarded when 
+        the model is renumbered.
+
+        Parameters
+        ----------
+        key: str or None
+            The key. If None, modal results are not shared.
+        """
+
+        self.key = key
 
 
     def setDampingCoefficients(self, alpha, beta):
@@ -427,91 +1189,305 @@ class Plot(object):
 
 
 
+def assemble(model, *matrices):
+
+    """
+    Assemble the system matrices in a single traversal of the model elements.
+    The element Jacobians and the global indices are evaluated once and 
+    shared among all the requested matrices.
+
+    Parameters
+    ----------
+    model: Model
+        The model to be assembled.
+    matrices: {'stiffness', 'mass', 'damping'}
+        The names of the matrices to be assembled. The damping matrix is 
+        formed as Rayleigh damping from the model damping coefficients.
+
+    Returns
+    -------
+    matrices: tuple
+        The assembled Matrix instances, in the order of the requested names.
+
+    Raises
+    ------
+    TypeError
+        If an invalid matrix name is specified.
+    """
+
+    for name in matrices:
+        if name not in ['stiffness', 'mass', 'damping']:
+            error = 'Matrix must be either "{}", "{}" or "{}".'
+            raise TypeError(error.format('stiffness', 'mass', 'damping'))
+
+    # Matrices specified beforehand through Model.setMatrices are not 
+    # assembled again
+
+    full = dict(model.matrices)
+
+    stiffness = ('stiffness' in matrices or 'damping' in matrices) and \
+            'stiffness' not in full
+    mass = ('mass' in matrices or 'damping' in matrices) and 'mass' not in full
+
+    pattern = model.getPattern()
+    kvalues, mvalues = [], []
+
+    coordinates = model.getNodeCoordinates()
+    groups = model.getElementGroups() if stiffness or mass else []
+
+    for group in groups:
+        etype, irule = group.type, group.irule
+
+        ncoords = coordinates[group.connectivity]
+        cmatrix, densities = group.cmatrix, group.density
+        thickness = group.thickness
+
+        if stiffness and mass:
+            kglob, mglob = etype.getBatchStiffnessMass(
+                    ncoords, cmatrix, thickness, densities, irule)
+        elif stiffness:
+            kglob = etype.getBatchStiffness(ncoords, cmatrix, thickness, irule)
+        else:
+            mglob = etype.getBatchMass(ncoords, densities, thickness, irule)
+
+        if stiffness:
+            kvalues.append(kglob.ravel())
+
+        if mass:
+            mvalues.append(mglob.ravel())
+
+    if stiffness:
+        K = pattern.getMatrix(kvalues, model.springs[2], model.springs[3])
+
+    if mass:
+        M = pattern.getMatrix(mvalues, model.masses[2], model.masses[3])
+
+    if stiffness:
+        full['stiffness'] = K
+
+    if mass:
+        full['mass'] = M
+
+    if 'damping' in matrices:
+        full['damping'] = model.alpha*full['mass']+model.beta*full['stiffness']
+
+    classes = {'stiffness': Stiffness, 'mass': Mass, 'damping': Damping}
+
+    return tuple(classes[name](model, full[name]) for name in matrices)
+
+
+
+class Pattern:
+
+    """
+    Class for the symbolic structure of the system matrices in compressed
+    sparse row format, together with the map scattering the entries of the
+    element matrices to the positions of the matrix data. The structure 
+    always includes the diagonal, so that nodal springs and masses can be
+    added without changing the pattern.
+
+    Parameters
+    ----------
+    dofs: list
+        The element degrees of freedom, as a list of (e x d) arrays, one per
+        element group, where e is the number of elements and d the number
+        of element degrees of freedom.
+    size: int
+        The number of degrees of freedom of the system.
+
+    Attributes
+    ----------
+    indptr: ndarray
+        The row pointers of the compressed sparse row format.
+    indices: ndarray
+        The column indices of the compressed sparse row format.
+    scatter: ndarray
+        The position in the matrix data of each entry of the element 
+        matrices, in the order of the element groups.
+    diagonal: ndarray
+        The position in the matrix data of each diagonal entry.
+    cache: OrderedDict
+        The patterns already computed, keyed by the element degrees of 
+        freedom. At most cacheSize patterns are retained.
+
+    Methods
+    -------
+    fromDegreesOfFreedom(dofs, size)
+        Get the pattern from the cache or compute it.
+    getMatrix(values, dofs, diagonal)
+        Get the sparse matrix for a set of element matrix entries.
+    """
+
+    cache = OrderedDict()
+    cacheSize = 8
+
+    def __init__(self, dofs, size):
+
+        self.size = size
+
+        rows = [np.repeat(dof, dof.shape[1], axis=1).ravel() for dof in dofs]
+        cols = [np.tile(dof, dof.shape[1]).ravel() for dof in dofs]
+
+        rows = np.hstack(rows+[np.arange(size)]).astype(np.int64)
+        cols = np.hstack(cols+[np.arange(size)]).astype(np.int64)
+
+        keys, inverse = np.unique(rows*size+cols, return_inverse=True)
+        counts = np.bincount(keys//size, minlength=size)
+
+        self.indptr = np.hstack(([0], np.cumsum(counts)))
+        self.indices = keys%size
+        self.scatter = inverse[:-size] if size else inverse
+        self.diagonal = inverse[len(inverse)-size:]
+
+
+    @classmethod
+    def fromDegreesOfFreedom(cls, dofs, size):
+
+        """
+        Get the pattern for the specified element degrees of freedom from
+        the cache, or compute and cache it if not available.
+
+        Parameters
+        ----------
+        dofs: list
+            The element degrees of freedom, as a list of (e x d) arrays.
+        size: int
+            The number of degrees of freedom of the system.
+
+        Returns
+        -------
+        pattern: Pattern
+            The sparsity pattern.
+        """
+
+        digest = hashlib.sha1()
+
+        for dof in dofs:
+            dof = np.ascontiguousarray(dof, dtype=np.int64)
+            digest.update(str(dof.shape).encode())
+            digest.update(dof.tobytes())
+
+        key = (size, digest.hexdigest())
+
+        if key in cls.cache:
+            cls.cache.move_to_end(key)
+        else:
+            cls.cache[key] = cls(dofs, size)
+
+            if len(cls.cache) > cls.cacheSize:
+                cls.cache.popitem(last=False)
+
+        return cls.cache[key]
+
+
+    def getMatrix(self, values, dofs=[], diagonal=[]):
+
+        """
+        Get the sparse matrix by scattering the element matrix entries into
+        the matrix data.
+
+        Parameters
+        ----------
+        values: list
+            The flattened element matrices, as a list of arrays, one per 
+            element group.
+        dofs: list, optional
+            The degrees of freedom of additional diagonal entries.
+        diagonal: list, optional
+            The values of additional diagonal entries.
+
+        Returns
+        -------
+        matrix: scipy.sparse.csr_matrix
+            The sparse matrix.
+        """
+
+        values = np.hstack(values) if values else np.zeros(0)
+        data = np.bincount(self.scatter, weights=values, 
+                minlength=len(self.indices))
+        np.add.at(data, self.diagonal[np.array(dofs, dtype=int)], diagonal)
+
+        matrix = sps.csr_matrix((data, self.indices, self.indptr), 
+                shape=(self.size, self.size))
+
+        return matrix
+
+
+
 class Matrix(abc.ABC):
 
     @abc.abstractmethod
-    def __init__(self, model):
+    def __init__(self, model, full=None):
 
         self.model = model
-        m = len(self.model.ndof)
-        self.full = sps.csr_matrix((int(m), int(m)), dtype=float)
 
-        rng = int(5e3)
-        length = (25**2)*(rng*3)
-        end = len(self.model.elements)
-        num = max(end//rng, 2)
-        ind = np.linspace(0, end, num, dtype=int)
+        if full is None:
+            full = assemble(model, self.name)[0].full
 
-        for i in range(len(ind)-1):
-            data = np.zeros(length, dtype=float)
-            row = np.zeros(length, dtype=float)
-            col = np.zeros(length, dtype=float)
-            loc = 0
+        self.full = full
+        self.partitioned = None
 
-            for elm in self.model.elements[ind[i]:ind[i+1]]:
-                glob = getattr(elm, self.method)()
-                data, row, col, loc = elm.assemble(glob, data, row, col, loc)
 
-            self.full += sps.csr_matrix((data, (row, col)), shape=(m, m))
+    def getPartitioned(self):
 
+        """
+        Get the matrix with its rows and columns permuted so that the free 
+        degrees of freedom come first. The permuted matrix is computed once
+        and all partitions are obtained as contiguous slices of it.
+        """
 
-        if isinstance(self, Stiffness):
+        fdof, rdof, permutation = self.model.getPartition()
 
-            j, k = self.model.springs[2], self.model.springs[3]
-            self.full += sps.csr_matrix((k, (j, j)), shape=(m, m))
+        if self.partitioned is None or self.partitioned[0] is not permutation:
+            permuted = self.full[permutation][:, permutation].tocsc()
+            self.partitioned = (permutation, permuted)
 
-        elif isinstance(self, Mass):
-
-            j, k = self.model.masses[2], self.model.masses[3]
-            self.full += sps.csr_matrix((k, (j, j)), shape=(m, m))
+        return self.partitioned[1], len(fdof)
 
 
     def getPartitionFF(self):
 
-        fdof = list(self.model.fdof.values())
-        ff = self.full.tocsc()[:, fdof].tocsr()[fdof, :].tocsc()
-        return ff
+        permuted, f = self.getPartitioned()
+        return permuted[:f, :f]
 
 
     def getPartitionFR(self):
 
-        fdof = list(self.model.fdof.values())
-        rdof = list(self.model.rdof.values())
-        fr = self.full.tocsc()[:, rdof].tocsr()[fdof, :].tocsc()
-        return fr
+        permuted, f = self.getPartitioned()
+        return permuted[:f, f:]
 
 
     def getPartitionRF(self):
 
-        fdof = list(self.model.fdof.values())
-        rdof = list(self.model.rdof.values())
-        rf = self.full.tocsc()[:, fdof].tocsr()[rdof, :].tocsc()
-        return rf
+        permuted, f = self.getPartitioned()
+        return permuted[f:, :f]
 
 
     def getPartitionRR(self):
 
-        rdof = list(self.model.rdof.values())
-        rr = self.full.tocsc()[:, rdof].tocsr()[rdof, :].tocsc()
-        return rr
+        permuted, f = self.getPartitioned()
+        return permuted[f:, f:]
         
         
 class Stiffness(Matrix):
 
-    def __init__(self, model):
-        self.method = 'getStiffness'
-        super().__init__(model)
+    name = 'stiffness'
+
+    def __init__(self, model, full=None):
+        super().__init__(model, full)
 
 
 class Damping(Matrix):
 
-    def __init__(self, model):
-        self.method = 'getDamping'
-        super().__init__(model)
+    name = 'damping'
+
+    def __init__(self, model, full=None):
+        super().__init__(model, full)
         
         
 class Mass(Matrix):
+
+    name = 'mass'
     
-    def __init__(self, model):
-        self.method = 'getMass'
-        super().__init__(model)
+    def __init__(self, model, full=None):
+        super().__init__(model, full)
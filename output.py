@@ -0,0 +1,394 @@
+import os
+import abc
+import json
+import zipfile
+import tempfile
+
+import numpy as np
+
+
+class Writer(abc.ABC):
+
+    """
+    Base class for the writers of job results. Each result quantity, e.g.,
+    displacements or strains, is written under the job name together with
+    the labels of its channels, while the metadata, e.g., the time vector,
+    the output nodes and the job parameters, are written once per job.
+    Quantities can be written at once or streamed row by row in blocks, 
+    e.g., time blocks of a time history analysis.
+
+    Parameters
+    ----------
+    name: str
+        The job name, used as prefix of the output files.
+
+    Methods
+    -------
+    open(quantity, shape, labels, fmt, header)
+        Open a result quantity for streaming.
+    append(quantity, block)
+        Append a block of rows to a result quantity.
+    write(quantity, data, labels, fmt, header)
+        Write a result quantity.
+    setMetadata(**metadata)
+        Specify the metadata of the job.
+    close()
+        Complete the output of the job.
+    """
+
+    extension = None
+
+    def __init__(self, name):
+        self.name = name
+        self.metadata = {}
+        self.labels = {}
+        self.streams = {}
+
+
+    def getFileName(self, quantity):
+
+        """ Get the name of the file storing the specified quantity. """
+
+        return '{}_{}.{}'.format(self.name, quantity, self.extension)
+
+
+    def setMetadata(self, **metadata):
+
+        """
+        Specify the metadata of the job. Arrays are stored as such by the
+        binary writers, while other values must be JSON serializable.
+        """
+
+        self.metadata.update(metadata)
+
+
+    @abc.abstractmethod
+    def open(self, quantity, shape, labels=None, fmt='% .16e', header=None):
+
+        """
+        Open a result quantity, to be written by appending blocks of rows.
+
+        Parameters
+        ----------
+        quantity: str
+            The name of the quantity, e.g., 'displacements'.
+        shape: tuple
+            The shape of the quantity, with the rows along the first axis.
+        labels: list, optional
+            The labels of the output channels, i.e., the degrees of freedom
+            or strain components at the output nodes.
+        fmt: str
+            The number format, used only by text writers.
+        header: str, optional
+            The header of text files, by default the channel labels padded
+            to 24 characters.
+        """
+
+        pass
+
+
+    @abc.abstractmethod
+    def append(self, quantity, block):
+
+        """
+        Append a block of rows to an open result quantity.
+
+        Parameters
+        ----------
+        quantity: str
+            The name of the quantity.
+        block: ndarray
+            The block of rows.
+        """
+
+        pass
+
+
+    def write(self, quantity, data, labels=None, fmt='% .16e', header=None):
+
+        """
+        Write a result quantity at once.
+
+        Parameters
+        ----------
+        quantity: str
+            The name of the quantity, e.g., 'displacements'.
+        data: ndarray
+            The values of the quantity.
+        labels: list, optional
+            The labels of the output channels.
+        fmt: str
+            The number format, used only by text writers.
+        header: str, optional
+            The header of text files, by default the channel labels padded
+            to 24 characters.
+        """
+
+        data = np.asarray(data)
+
+        self.open(quantity, data.shape, labels, fmt, header)
+        self.append(quantity, data)
+        self.finish(quantity)
+
+
+    def finish(self, quantity):
+
+        """ Complete the output of a result quantity. """
+
+        self.streams.pop(quantity)
+
+
+    def close(self):
+
+        """ Complete the output of the job. """
+
+        for quantity in list(self.streams):
+            self.finish(quantity)
+
+
+    def getParameters(self):
+
+        """ Get the non-array metadata as a JSON string. """
+
+        parameters = {key: value for key, value in self.metadata.items()
+                if not isinstance(value, np.ndarray)}
+
+        return json.dumps(parameters, default=serialize)
+
+
+
+class TextWriter(Writer):
+
+    """
+    Class for writing job results as text files, one per quantity, with the
+    channel labels in the header. Blocks are appended to the open files. 
+    Metadata are not written.
+    """
+
+    extension = 'dat'
+
+    def open(self, quantity, shape, labels=None, fmt='% .16e', header=None):
+
+        file = open(self.getFileName(quantity), 'w')
+
+        if header is None and labels is not None:
+            header = ''.join(label.ljust(24, ' ') for label in labels)
+
+        if header is not None:
+            file.write('# '+header+'\n')
+
+        self.streams[quantity] = (file, fmt)
+
+
+    def append(self, quantity, block):
+
+        file, fmt = self.streams[quantity]
+        np.savetxt(file, block, fmt=fmt)
+
+
+    def finish(self, quantity):
+
+        file, fmt = self.streams.pop(quantity)
+        file.close()
+
+
+
+class NumpyWriter(Writer):
+
+    """
+    Class for writing job results as binary .npy files, one per quantity.
+    Files are allocated and written through memory maps, so that blocks are
+    stored in place and the files can be loaded with numpy.load(fname, 
+    mmap_mode='r') without reading them entirely. Channel labels and 
+    metadata are written in a JSON file and the metadata arrays in 
+    additional .npy files.
+    """
+
+    extension = 'npy'
+
+    def open(self, quantity, shape, labels=None, fmt='% .16e', header=None):
+
+        mmap = np.lib.format.open_memmap(self.getFileName(quantity),
+                mode='w+', dtype=float, shape=tuple(shape))
+
+        self.streams[quantity] = [mmap, 0]
+        self.labels[quantity] = list(labels) if labels is not None else None
+
+
+    def append(self, quantity, block):
+
+        block = np.asarray(block)
+        stream = self.streams[quantity]
+
+        mmap, row = stream
+        mmap[row:row+len(block)] = block
+        stream[1] = row+len(block)
+
+
+    def finish(self, quantity):
+
+        mmap, row = self.streams.pop(quantity)
+        mmap.flush()
+
+
+    def close(self):
+
+        super().close()
+
+        for key, value in self.metadata.items():
+            if isinstance(value, np.ndarray):
+                np.save(self.getFileName(key), value)
+
+        metadata = {'labels': self.labels, 'parameters': json.loads(self.getParameters())}
+
+        with open('{}_metadata.json'.format(self.name), 'w') as file:
+            json.dump(metadata, file, indent=1)
+
+
+
+class ArchiveWriter(NumpyWriter):
+
+    """
+    Class for writing all job results in a single uncompressed .npz
+    archive. Each quantity is stored under its name, its channel labels
+    under the name suffixed by '_labels', the metadata arrays under their
+    own names and the remaining metadata as a JSON string under
+    'parameters'. Quantities are streamed into memory-mapped temporary 
+    files, which are moved into the archive when completed.
+    """
+
+    extension = 'npz'
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.folder = tempfile.mkdtemp(prefix=name+'_')
+        self.archive = zipfile.ZipFile('{}.npz'.format(name), mode='w',
+                compression=zipfile.ZIP_STORED, allowZip64=True)
+
+
+    def getFileName(self, quantity):
+        return os.path.join(self.folder, quantity+'.npy')
+
+
+    def add(self, key, value):
+
+        """ Add an array to the archive. """
+
+        with self.archive.open(key+'.npy', mode='w', force_zip64=True) as file:
+            np.lib.format.write_array(file, np.asanyarray(value), allow_pickle=False)
+
+
+    def finish(self, quantity):
+
+        super().finish(quantity)
+
+        fname = self.getFileName(quantity)
+        self.archive.write(fname, arcname=quantity+'.npy')
+        os.remove(fname)
+
+        if self.labels[quantity] is not None:
+            self.add(quantity+'_labels', np.array(self.labels[quantity], dtype=str))
+
+
+    def close(self):
+
+        Writer.close(self)
+
+        for key, value in self.metadata.items():
+            if isinstance(value, np.ndarray):
+                self.add(key, value)
+
+        self.add('parameters', np.array(self.getParameters()))
+        self.archive.close()
+        os.rmdir(self.folder)
+
+
+
+class MultiWriter(Writer):
+
+    """
+    Class for writing job results through several writers at once, e.g., 
+    the writer of the requested output format and that of a result cache.
+
+    Parameters
+    ----------
+    writers: Writer
+        The writers, the first of which determines the job name.
+    """
+
+    def __init__(self, *writers):
+        super().__init__(writers[0].name)
+        self.writers = writers
+
+
+    def setMetadata(self, **metadata):
+
+        for writer in self.writers:
+            writer.setMetadata(**metadata)
+
+
+    def open(self, quantity, shape, labels=None, fmt='% .16e', header=None):
+
+        for writer in self.writers:
+            writer.open(quantity, shape, labels, fmt, header)
+
+
+    def append(self, quantity, block):
+
+        for writer in self.writers:
+            writer.append(quantity, block)
+
+
+    def finish(self, quantity):
+
+        for writer in self.writers:
+            writer.finish(quantity)
+
+
+    def close(self):
+
+        for writer in self.writers:
+            writer.close()
+
+
+
+def serialize(value):
+
+    """ Convert numpy arrays and scalars to JSON serializable values. """
+
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+
+    raise TypeError('{} is not JSON serializable.'.format(type(value).__name__))
+
+
+def getWriter(name, fmt='dat'):
+
+    """
+    Get the writer for the specified output format.
+
+    Parameters
+    ----------
+    name: str
+        The job name.
+    fmt: {'dat', 'npy', 'npz'}
+        The output format.
+
+    Returns
+    -------
+    writer: Writer
+        The writer.
+
+    Raises
+    ------
+    TypeError
+        If an invalid output format is specified.
+    """
+
+    writers = {'dat': TextWriter, 'npy': NumpyWriter, 'npz': ArchiveWriter}
+
+    if fmt.lower() not in writers:
+        error = 'Output format must be either "{}", "{}" or "{}".'
+        raise TypeError(error.format(*writers))
+
+    return writers[fmt.lower()](name)
@@ -15,18 +15,38 @@ class Quadrilateral(abc.ABC):
     Class for interfacing the methods of quadrilateral elements for 
     plane-stress and plane strain problems.
 
+    Attributes
+    ----------
+    tables: dict
+        The cache of reference-element tables, shared by all element types
+        and keyed by element type and evaluation points.
+
     Methods
     -------
     getStiffness(ncoords, cmatrix, thickness, irule)
         Get the global stiffness matrix.
     getMass(ncoords, mdensity, thickness, irule)
         Get the global mass matrix.
+    getBatchStiffness(ncoords, cmatrix, thickness, irule)
+        Get the global stiffness matrices of a batch of elements.
+    getBatchMass(ncoords, mdensity, thickness, irule)
+        Get the global mass matrices of a batch of elements.
+    getBatchStiffnessMass(ncoords, cmatrix, thickness, mdensity, irule)
+        Get the global stiffness and mass matrices of a batch of elements.
     getJacobian(ncoords, r1, r2)
         Get the Jacobian.
     getDeformationMatrix(ncoords, r1, r2)
         Get the deformation matrix.
+    getBatchDeformationMatrix(ncoords, r1, r2)
+        Get the deformation matrices of a batch of elements.
+    getTables(points)
+        Get the cached reference-element tables at a set of points.
+    getExtrapolationMatrix(irule, points)
+        Get the extrapolation matrix from integration points to nodes.
     """
 
+    tables = {}
+
     def getStiffness(self, ncoords, cmatrix, thickness, irule):
 
         """
@@ -51,13 +71,10 @@ class Quadrilateral(abc.ABC):
             The global stiffness matrix.
         """
 
-        stiffness = np.zeros((self.degrees, self.degrees))
+        stiffness = self.getBatchStiffness(ncoords[np.newaxis], 
+                cmatrix[np.newaxis], np.asarray(thickness)[np.newaxis], irule)
 
-        for C, t, (r1, r2, w1, w2) in zip(cmatrix, thickness, irule):
-            B, jacobian = self.getDeformationMatrix(ncoords, r1, r2)
-            stiffness += w1*w2*B.T.dot(C).dot(B)*np.linalg.det(jacobian)*t
-
-        return stiffness
+        return stiffness[0]
 
 
     def getMass(self, ncoords, mdensity, thickness, irule):
@@ -84,14 +101,11 @@ class Quadrilateral(abc.ABC):
             The global mass matrix.
         """
 
-        mass = np.zeros((self.degrees, self.degrees))
+        mass = self.getBatchMass(ncoords[np.newaxis], 
+                np.asarray(mdensity)[np.newaxis], 
+                np.asarray(thickness)[np.newaxis], irule)
 
-        for density, t, (r1, r2, w1, w2) in zip(mdensity, thickness, irule):
-            N = self.getShapeFunctionsMatrix(r1, r2)
-            jacobian = self.getJacobian(ncoords, r1, r2)
-            mass += w1*w2*N.T.dot(N)*density*np.linalg.det(jacobian)*t
-
-        return mass
+        return mass[0]
 
 
     def getStiffnessMass(self, ncoords, cmatrix, thickness, mdensity, irule):
@@ -122,18 +136,140 @@ class Quadrilateral(abc.ABC):
             The global mass matrix.
         """
 
-        stiffness = np.zeros((self.degrees, self.degrees))
-        mass = np.zeros((self.degrees, self.degrees))
+        stiffness, mass = self.getBatchStiffnessMass(ncoords[np.newaxis], 
+                cmatrix[np.newaxis], np.asarray(thickness)[np.newaxis], 
+                np.asarray(mdensity)[np.newaxis], irule)
 
-        for C, r, t, (r1, r2, w1, w2) in zip(cmatrix, mdensity, thickness, irule):
-            B, jacobian = self.getDeformationMatrix(ncoords, r1, r2)
-            N = self.getShapeFunctionsMatrix(r1, r2)
+        return stiffness[0], mass[0]
 
-            stiffness += w1*w2*B.T.dot(C).dot(B)*np.linalg.det(jacobian)*t
-            mass += w1*w2*N.T.dot(N)*r*np.linalg.det(jacobian)*t
 
-        return stiffness, mass
 
+    def getBatchStiffness(self, ncoords, cmatrix, thickness, irule):
+
+        """
+        Get the global stiffness matrices of a batch of elements.
+
+        Parameters
+        ----------
+        ncoords: ndarray
+            The nodal coordinates (e x n x 2), where e is the number of 
+            elements and n is the number of nodes.
+        cmatrix: ndarray
+            The material constitutive matrices (e x p x 3 x 3) at the 
+            integration points, where p is the number of integration points.
+        thickness: ndarray
+            The element thicknesses (e x p) at the integration points.
+        irule: ndarray
+            The integration rule (p x 4), where p is the number of integration
+            points. The first two columns contain the sample points while the
+            last one contains the corresponding weights.
+
+        Returns
+        -------
+        stiffness: ndarray
+            The global stiffness matrices (e x d x d), where d is the number 
+            of degrees of freedom.
+        """
+
+        B, determinant = self.getBatchDeformationMatrix(
+                ncoords, irule[:, 0], irule[:, 1])
+
+        factor = irule[:, 2]*irule[:, 3]*determinant*thickness
+        CB = np.matmul(cmatrix, B)*factor[:, :, np.newaxis, np.newaxis]
+
+        elements, points = B.shape[:2]
+        B = B.reshape((elements, points*3, self.degrees))
+        CB = CB.reshape((elements, points*3, self.degrees))
+        stiffness = np.matmul(B.transpose((0, 2, 1)), CB)
+
+        return stiffness
+
+
+    def getBatchMass(self, ncoords, mdensity, thickness, irule):
+
+        """
+        Get the global mass matrices of a batch of elements.
+
+        Parameters
+        ----------
+        ncoords: ndarray
+            The nodal coordinates (e x n x 2), where e is the number of 
+            elements and n is the number of nodes.
+        mdensity: ndarray
+            The material densities (e x p) at the integration points, where
+            p is the number of integration points.
+        thickness: ndarray
+            The element thicknesses (e x p) at the integration points.
+        irule: ndarray
+            The integration rule (p x 4), where p is the number of integration
+            points. The first two columns contain the sample points while the
+            last one contains the corresponding weights.
+
+        Returns
+        -------
+        mass: ndarray
+            The global mass matrices (e x d x d), where d is the number of
+            degrees of freedom.
+        """
+
+        jacobian = self.getBatchJacobian(ncoords, irule[:, 0], irule[:, 1])
+        determinant = self.getBatchDeterminant(jacobian)
+
+        factor = irule[:, 2]*irule[:, 3]*determinant*thickness*mdensity
+        mass = np.tensordot(factor, self.getBatchShapeFunctionsProduct(
+                irule[:, 0], irule[:, 1]), axes=1)
+
+        return mass
+
+
+    def getBatchStiffnessMass(self, ncoords, cmatrix, thickness, mdensity, 
+            irule):
+
+        """
+        Get the global stiffness and mass matrices of a batch of elements,
+        sharing the evaluation of the Jacobians between the two.
+
+        Parameters
+        ----------
+        ncoords: ndarray
+            The nodal coordinates (e x n x 2), where e is the number of 
+            elements and n is the number of nodes.
+        cmatrix: ndarray
+            The material constitutive matrices (e x p x 3 x 3) at the 
+            integration points, where p is the number of integration points.
+        thickness: ndarray
+            The element thicknesses (e x p) at the integration points.
+        mdensity: ndarray
+            The material densities (e x p) at the integration points.
+        irule: ndarray
+            The integration rule (p x 4), where p is the number of integration
+            points. The first two columns contain the sample points while the
+            last one contains the corresponding weights.
+
+        Returns
+        -------
+        stiffness: ndarray
+            The global stiffness matrices (e x d x d), where d is the number 
+            of degrees of freedom.
+        mass: ndarray
+            The global mass matrices (e x d x d).
+        """
+
+        B, determinant = self.getBatchDeformationMatrix(
+                ncoords, irule[:, 0], irule[:, 1])
+
+        factor = irule[:, 2]*irule[:, 3]*determinant*thickness
+        CB = np.matmul(cmatrix, B)*factor[:, :, np.newaxis, np.newaxis]
+
+        elements, points = B.shape[:2]
+        B = B.reshape((elements, points*3, self.degrees))
+        CB = CB.reshape((elements, points*3, self.degrees))
+        stiffness = np.matmul(B.transpose((0, 2, 1)), CB)
+
+        mass = np.tensordot(factor*mdensity, self.getBatchShapeFunctionsProduct(
+                irule[:, 0], irule[:, 1]), axes=1)
+
+        return stiffness, mass
 
 
     def getStrain(self, ncoords, displacements, ipoints, r1, r2):
@@ -156,14 +292,12 @@ class Quadrilateral(abc.ABC):
             which the strain vector is returned.
         """
 
-        istrain = np.zeros((3, ipoints.shape[0], displacements.shape[1]))
-
-        for j, (px, py) in enumerate(ipoints):
-            B, J = self.getDeformationMatrix(ncoords, px, py)
-            istrain[:, j, :] = B.dot(displacements)
+        B, determinant = self.getBatchDeformationMatrix(
+                ncoords[np.newaxis], ipoints[:, 0], ipoints[:, 1])
+        istrain = np.matmul(B[0], displacements).transpose((1, 0, 2))
 
-        sfactor = np.max(ipoints[:, 0])
-        strain = self.getShapeFunctions(r1/sfactor, r2/sfactor).dot(istrain)
+        extrapolation = self.getExtrapolationMatrix(ipoints, np.array([[r1, r2]]))
+        strain = extrapolation[0].dot(istrain)
         strain = strain.squeeze()
 
         return strain
@@ -206,6 +340,229 @@ class Quadrilateral(abc.ABC):
         return deformation, jacobian
 
 
+    def getBatchDeformationMatrix(self, ncoords, r1, r2):
+
+        """
+        Get the deformation matrices of a batch of elements at a set of 
+        points, using the closed-form inverse of the 2 x 2 Jacobians.
+
+        Parameters
+        ----------
+        ncoords: ndarray
+            The nodal coordinates (e x n x 2), where e is the number of 
+            elements and n is the number of nodes.
+        r1, r2: ndarray
+            The quadrilateral natural coordinates (p), ranging from -1 to 1,
+            where p is the number of points.
+
+        Returns
+        -------
+        deformation: ndarray
+            The deformation matrices (e x p x 3 x d), where d is the number
+            of degrees of freedom.
+        determinant: ndarray
+            The Jacobian determinants (e x p).
+        """
+
+        jacobian = self.getBatchJacobian(ncoords, r1, r2)
+        determinant = self.getBatchDeterminant(jacobian)
+
+        inverse = np.empty(jacobian.shape)
+        inverse[..., 0, 0] = jacobian[..., 1, 1]
+        inverse[..., 0, 1] = -jacobian[..., 0, 1]
+        inverse[..., 1, 0] = -jacobian[..., 1, 0]
+        inverse[..., 1, 1] = jacobian[..., 0, 0]
+        inverse /= determinant[..., np.newaxis, np.newaxis]
+
+        data = np.matmul(inverse, self.getBatchShapeFunctionsDerivatives(r1, r2))
+        deformation = np.zeros(data.shape[:2]+(3, self.degrees))
+
+        deformation[..., 0, 0::2] = data[..., 0, :]
+        deformation[..., 1, 1::2] = data[..., 1, :]
+        deformation[..., 2, 0::2] = data[..., 1, :]
+        deformation[..., 2, 1::2] = data[..., 0, :]
+
+        return deformation, determinant
+
+
+    def getBatchJacobian(self, ncoords, r1, r2):
+
+        """
+        Get the Jacobian matrices of a batch of elements at a set of points.
+
+        Parameters
+        ----------
+        ncoords: ndarray
+            The nodal coordinates (e x n x 2), where e is the number of 
+            elements and n is the number of nodes.
+        r1, r2: ndarray
+            The quadrilateral natural coordinates (p), ranging from -1 to 1,
+            where p is the number of points.
+
+        Returns
+        -------
+        jacobian: ndarray
+            The jacobian matrices (e x p x 2 x 2).
+        """
+
+        derivatives = self.getBatchShapeFunctionsDerivatives(r1, r2)
+        jacobian = np.matmul(derivatives, ncoords[:, np.newaxis, :, :])
+
+        return jacobian
+
+
+    @staticmethod
+    def getBatchDeterminant(jacobian):
+
+        """
+        Get the determinants of a stack of 2 x 2 Jacobian matrices.
+
+        Parameters
+        ----------
+        jacobian: ndarray
+            The jacobian matrices (... x 2 x 2).
+
+        Returns
+        -------
+        determinant: ndarray
+            The jacobian determinants (...).
+        """
+
+        determinant = jacobian[..., 0, 0]*jacobian[..., 1, 1]-\
+                      jacobian[..., 0, 1]*jacobian[..., 1, 0]
+
+        return determinant
+
+
+    def getBatchShapeFunctionsDerivatives(self, r1, r2):
+
+        """
+        Get the shape functions derivatives at a set of points.
+
+        Parameters
+        ----------
+        r1, r2: ndarray
+            The quadrilateral natural coordinates (p), ranging from -1 to 1,
+            where p is the number of points.
+
+        Returns
+        -------
+        derivatives: ndarray
+            The shape functions derivatives (p x 2 x n), where n is the 
+            number of nodes.
+        """
+
+        points = np.column_stack((r1, r2))
+        derivatives = self.getTables(points)['derivatives']
+
+        return derivatives
+
+
+    def getBatchShapeFunctionsProduct(self, r1, r2):
+
+        """
+        Get the products N^T N of the shape functions matrices at a set of
+        points, i.e., the integrands of the mass matrix in natural 
+        coordinates.
+
+        Parameters
+        ----------
+        r1, r2: ndarray
+            The quadrilateral natural coordinates (p), ranging from -1 to 1,
+            where p is the number of points.
+
+        Returns
+        -------
+        product: ndarray
+            The shape functions matrices products (p x d x d), where d is the
+            number of degrees of freedom.
+        """
+
+        points = np.column_stack((r1, r2))
+        product = self.getTables(points)['products']
+
+        return product
+
+
+    def getTables(self, points):
+
+        """
+        Get the reference-element tables, i.e., the shape functions, their
+        derivatives, the shape functions matrices and their products, 
+        evaluated at a set of points. The tables depend only on the element
+        type and the points, so they are computed once and cached.
+
+        Parameters
+        ----------
+        points: ndarray
+            The quadrilateral natural coordinates (p x 2), ranging from -1 
+            to 1, where p is the number of points.
+
+        Returns
+        -------
+        tables: dict
+            The tables with keys 'functions' (p x n), 'derivatives' 
+            (p x 2 x n), 'matrices' (p x 2 x d) and 'products' (p x d x d),
+            where n is the number of nodes and d is the number of degrees of
+            freedom. The arrays are read-only.
+        """
+
+        points = np.ascontiguousarray(points, dtype=float)
+        key = (type(self), points.shape, points.tobytes())
+
+        if key not in Quadrilateral.tables:
+            functions = np.array([self.getShapeFunctions(r1, r2)
+                    for r1, r2 in points])
+            derivatives = np.array([self.getShapeFunctionsDerivatives(r1, r2)
+                    for r1, r2 in points])
+            matrices = np.array([self.getShapeFunctionsMatrix(r1, r2)
+                    for r1, r2 in points])
+            products = np.matmul(matrices.transpose((0, 2, 1)), matrices)
+
+            tables = {'functions': functions, 'derivatives': derivatives,
+                    'matrices': matrices, 'products': products}
+
+            for table in tables.values():
+                table.flags.writeable = False
+
+            Quadrilateral.tables[key] = tables
+
+        return Quadrilateral.tables[key]
+
+
+    def getExtrapolationMatrix(self, irule, points=None):
+
+        """
+        Get the matrix extrapolating values from the integration points to
+        the element nodes, or to other points. The extrapolation uses the 
+        shape functions evaluated at the point coordinates scaled to the 
+        integration points, and thus requires as many integration points as
+        element nodes.
+
+        Parameters
+        ----------
+        irule: ndarray
+            The integration rule (p x 4), where p is the number of integration
+            points. The first two columns contain the sample points, in the 
+            order of the element nodes.
+        points: ndarray, optional
+            The natural coordinates (n x 2) of the points. If not specified,
+            the element nodes are used.
+
+        Returns
+        -------
+        extrapolation: ndarray
+            The extrapolation matrix (n x p).
+        """
+
+        points = self.nodes if points is None else np.asarray(points)
+
+        sfactor = np.max(irule[:, 0])
+        extrapolation = self.getTables(points/sfactor)['functions']
+
+        return extrapolation
+
+
     def getJacobian(self, ncoords, r1, r2):
 
         """
@@ -269,6 +626,8 @@ class Quad4(Quadrilateral):
     ----------
     degrees: int
         The number of degrees of freedom.
+    nodes: ndarray
+        The natural coordinates of the element nodes.
 
     Methods
     -------
@@ -302,6 +661,7 @@ class Quad4(Quadrilateral):
     """
 
     degrees = 8
+    nodes = np.array([[1, 1], [-1, 1], [-1, -1], [1, -1]])
 
     @staticmethod
     def getShapeFunctions(r1, r2):
@@ -399,6 +759,9 @@ class Quad8(Quadrilateral):
     """
 
     degrees = 16
+    nodes = np.array([
+            [1, 1], [-1, 1], [-1, -1], [1, -1],
+            [0, 1], [-1, 0], [0, -1], [1, 0]])
 
     @staticmethod
     def getShapeFunctions(r1, r2):
@@ -512,6 +875,9 @@ class Quad9(Quadrilateral):
     """
 
     degrees = 18
+    nodes = np.array([
+            [1, 1], [-1, 1], [-1, -1], [1, -1],
+            [0, 1], [-1, 0], [0, -1], [1, 0], [0, 0]])
 
     @staticmethod
     def getShapeFunctions(r1, r2):
@@ -0,0 +1,292 @@
+import copy
+import itertools as it
+
+import numpy as np
+
+import front2back
+
+
+def setModel(job, value):
+    job.setModel(int(value))
+
+
+def setThickness(job, value):
+    job.setThickness(value)
+
+
+def setDamage(job, value):
+    job.setDamage(value)
+
+
+def setTemperature(job, value):
+
+    """ Specify a temperature profile, or a uniform temperature value. """
+
+    job.setTemperature(value if np.ndim(value) == 2 else np.array([[value, 0.5]]))
+
+
+def setCorrosion(job, value):
+
+    """ Specify a corrosion profile, or a uniform corrosion wastage value. """
+
+    job.setCorrosion(value if np.ndim(value) == 2 else np.array([[value, 0.5]]))
+
+
+def setStiffness(job, value, direction):
+
+    """ Specify the stiffness of all supports in the specified direction. """
+
+    boundaries = [np.array(boundary, dtype=float) for boundary in job.getBoundaries()]
+
+    for boundary in boundaries:
+        boundary[:, direction] = value
+
+    job.setBoundaries(*boundaries)
+
+
+def setSupportPosition(job, value, index):
+
+    """ Specify the position (x/L) of a support, keeping its springs. """
+
+    supports = job.getSupports()
+    positions = list(supports['Positions'])
+    positions[index] = value
+
+    job.setSupports(positions, supports['Springs'])
+
+
+def setDampingCoefficient(job, value, name):
+
+    """ Specify a Rayleigh damping coefficient of time history analysis. """
+
+    settings = dict(job.getTimeHistorySettings())
+    settings[name] = value
+    job.setTimeHistorySettings(*settings.values())
+
+
+
+class Sweep:
+
+    """
+    Class for parameter sweeps, i.e., the generation of jobs over a grid
+    or random samples of job parameters. Each parameter is either discrete,
+    taking one of a list of values, or continuous, ranging between bounds
+    on a linear or logarithmic scale. Jobs are copies of a template job and
+    are generated lazily, so that they can be fed directly to
+    main.submitMany.
+
+    Parameters
+    ----------
+    name: str
+        The prefix of the job names, which are numbered in order of
+        generation.
+    template: front2back.BackendJob, optional
+        The job whose parameters are not swept. If not specified, a job
+        with default parameters is used.
+
+    Attributes
+    ----------
+    setters: dict
+        The functions applying a parameter value to a job, keyed by
+        parameter name.
+
+    Methods
+    -------
+    addParameter(name, values, bounds, scale, number)
+        Add a swept parameter.
+    getGrid()
+        Get the jobs of the full factorial grid.
+    getLatinHypercube(samples, seed)
+        Get the jobs of a Latin hypercube sample.
+    getMonteCarlo(samples, seed)
+        Get the jobs of a Monte Carlo sample.
+    """
+
+    setters = {
+        'Model': setModel,
+        'Thickness': setThickness,
+        'Damage': setDamage,
+        'Temperature': setTemperature,
+        'Corrosion': setCorrosion,
+        'Stiffness x': lambda job, value: setStiffness(job, value, 0),
+        'Stiffness y': lambda job, value: setStiffness(job, value, 1),
+        'Support 1': lambda job, value: setSupportPosition(job, value, 0),
+        'Support 2': lambda job, value: setSupportPosition(job, value, 1),
+        'Support 3': lambda job, value: setSupportPosition(job, value, 2),
+        'Alpha': lambda job, value: setDampingCoefficient(job, value, 'Alpha'),
+        'Beta': lambda job, value: setDampingCoefficient(job, value, 'Beta')}
+
+    def __init__(self, name, template=None):
+        self.name = name
+        self.template = front2back.BackendJob(name) if template is None else template
+        self.parameters = []
+
+
+    def addParameter(self, name, values=None, bounds=None, scale='linear', number=2):
+
+        """
+        Add a swept parameter, specified either by a list of discrete values
+        or by the bounds of a continuous range.
+
+        Parameters
+        ----------
+        name: {'Model', 'Thickness', 'Damage', 'Temperature', 'Corrosion',
+               'Stiffness x', 'Stiffness y', 'Support 1', 'Support 2', 
+               'Support 3', 'Alpha', 'Beta'}
+            The parameter name. Temperature and corrosion values are either
+            uniform values or profiles, as arrays in the format of the
+            corresponding BackendJob setters. Support values are the 
+            positions (x/L) of the left-most, middle and right-most support.
+        values: list, optional
+            The discrete parameter values.
+        bounds: tuple, optional
+            The lower and upper bounds of a continuous parameter.
+        scale: {'linear', 'log'}
+            The scale of a continuous parameter, e.g., 'log' for support
+            stiffness ranging over orders of magnitude.
+        number: int, positive
+            The number of values of a continuous parameter in a grid.
+
+        Raises
+        ------
+        TypeError
+            If the name is invalid or not exactly one of values and bounds
+            is specified.
+        """
+
+        if name not in self.setters:
+            error = 'Parameter must be one of {}.'
+            raise TypeError(error.format(', '.join(self.setters)))
+
+        if (values is None) == (bounds is None):
+            raise TypeError('Either values or bounds must be specified.')
+
+        if scale.lower() not in ['linear', 'log']:
+            error = 'Scale must be either "{}" or "{}".'
+            raise TypeError(error.format('linear', 'log'))
+
+        parameter = {'Name': name, 'Values': values, 'Bounds': bounds,
+                'Scale': scale.lower(), 'Number': number}
+
+        self.parameters.append(parameter)
+
+
+    def getValue(self, parameter, fraction):
+
+        """
+        Get the value of a parameter at a fraction [0-1) of its range, or
+        of its list of discrete values.
+        """
+
+        if parameter['Values'] is not None:
+            values = parameter['Values']
+            return values[min(int(fraction*len(values)), len(values)-1)]
+
+        low, high = parameter['Bounds']
+
+        if parameter['Scale'] == 'log':
+            return float(np.exp(np.log(low)+fraction*(np.log(high)-np.log(low))))
+
+        return float(low+fraction*(high-low))
+
+
+    def getJobs(self, samples):
+
+        """
+        Get the jobs for a sequence of samples, each sample being a sequence
+        of parameter values in order of parameters.
+        """
+
+        for index, sample in enumerate(samples):
+            job = copy.deepcopy(self.template)
+            job.setName('{}-{:05d}'.format(self.name, index))
+
+            for parameter, value in zip(self.parameters, sample):
+                self.setters[parameter['Name']](job, value)
+
+            yield job
+
+
+    def getGrid(self):
+
+        """
+        Get the jobs of the full factorial grid of the parameters, with the
+        continuous parameters taking equally spaced values in their range.
+
+        Returns
+        -------
+        jobs: generator
+            The jobs.
+        """
+
+        axes = []
+
+        for parameter in self.parameters:
+            if parameter['Values'] is not None:
+                axes.append(parameter['Values'])
+            else:
+                number = parameter['Number']
+                fractions = np.arange(number)/max(number-1, 1)
+
+                axes.append([self.getValue(parameter, fraction)
+                        for fraction in fractions])
+
+        return self.getJobs(it.product(*axes))
+
+
+    def getLatinHypercube(self, samples, seed=None):
+
+        """
+        Get the jobs of a Latin hypercube sample, in which the range of each
+        parameter is divided into equally probable intervals sampled once.
+
+        Parameters
+        ----------
+        samples: int, positive
+            The number of samples.
+        seed: int, optional
+            The seed of the random number generator.
+
+        Returns
+        -------
+        jobs: generator
+            The jobs.
+        """
+
+        generator = np.random.RandomState(seed)
+
+        fractions = np.array([(generator.permutation(samples)+
+                generator.uniform(size=samples))/samples
+                for parameter in self.parameters]).reshape((-1, samples))
+
+        return self.getJobs([[self.getValue(parameter, fraction)
+                for parameter, fraction in zip(self.parameters, column)]
+                for column in fractions.T])
+
+
+    def getMonteCarlo(self, samples, seed=None):
+
+        """
+        Get the jobs of a Monte Carlo sample, with the parameters uniformly
+        distributed in their range, or among their discrete values. Samples
+        are drawn as jobs are generated.
+
+        Parameters
+        ----------
+        samples: int, positive
+            The number of samples.
+        seed: int, optional
+            The seed of the random number generator.
+
+        Returns
+        -------
+        jobs: generator
+            The jobs.
+        """
+
+        generator = np.random.RandomState(seed)
+
+        values = ([self.getValue(parameter, generator.uniform())
+                for parameter in self.parameters] for sample in range(samples))
+
+        return self.getJobs(values)
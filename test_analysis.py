@@ -0,0 +1,97 @@
+import tracemalloc
+
+import numpy as np
+
+import analysis
+import front2back
+import loadcases
+import main
+import model
+
+
+def test_modal_mass_normalization():
+
+    """ Mode shapes are normalized to unit modal mass. """
+
+    model1, coordinates = main.getModel(front2back.BackendJob('Job-1'))
+
+    modal = analysis.Modal(model1)
+    modal.setNumberOfEigenvalues(5)
+    modal.submit()
+
+    fdof, rdof, permutation = model1.getPartition()
+    mass = modal.mass.getPartitionFF()
+    modes = modal.modes[fdof]
+
+    assert np.allclose(np.sum(modes*mass.dot(modes), 0), 1)
+
+
+def test_modal_memory_budget():
+
+    """
+    Modal analysis of a mesh ten times finer than the default one in both
+    directions (244k degrees of freedom) stays within 1 GB of allocated
+    memory, which a dense mass matrix of the free degrees of freedom would
+    exceed by orders of magnitude.
+    """
+
+    job = front2back.BackendJob('Job-1')
+    job.setMesh(2000, 60)
+
+    model1, coordinates = main.getModel(job)
+
+    tracemalloc.start()
+
+    try:
+        modal = analysis.Modal(model1)
+        modal.setNumberOfEigenvalues(5)
+        modal.submit()
+
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert modal.modes.shape == (len(model1.ndof), 5)
+    assert peak < 2**30
+
+
+def test_traffic_per_block():
+
+    """
+    The response to traffic forces generated per time block equals that to
+    the forces generated for the whole period.
+    """
+
+    responses = []
+
+    for blocks in [False, True]:
+        model1, coordinates = main.getModel(front2back.BackendJob('Job-1'))
+
+        nlabels = np.nonzero(np.isclose(coordinates[:, 1], coordinates[:, 1].max()))[0]
+        nlabels = nlabels[np.argsort(coordinates[nlabels, 0])]
+        positions = coordinates[nlabels, 0]
+
+        if blocks:
+            amplitudes = loadcases.Traffic(positions, 20, 0.01, rate=1).getFunctions()
+        else:
+            data = loadcases.getTraffic(positions, 20, 0.01, rate=1)
+            amplitudes = [np.array([data[:, 0], force]) for force in data[:, 1:].T]
+
+        model1.setDampingCoefficients(0.002, 0.0001)
+        model.Load(model1).addForce(nlabels, 'y', amplitudes)
+
+        dynamics = analysis.Dynamics(model1)
+        dynamics.setTimePeriod(20)
+        dynamics.setIncrementSize(0.01)
+        dynamics.setIntegrationMethod('Exact')
+        dynamics.setParticipationThreshold(0.9)
+        dynamics.setBlockSize(150 if blocks else None)
+        dynamics.submit()
+
+        # Mode shapes are defined up to their sign
+
+        ldof = model1.getLoadDegreesOfFreedom()
+        responses.append(dynamics.modes[ldof].dot(dynamics.displacement))
+
+    assert responses[0].shape == responses[1].shape
+    assert np.allclose(responses[0], responses[1], rtol=0, atol=1e-12*np.abs(responses[0]).max())
@@ -0,0 +1,31 @@
+import numpy as np
+
+import front2back
+import main
+
+
+def test_strain_operator_bilinear_field():
+
+    """
+    The strains of the bilinear displacement field u_x = x*y, u_y = 0, i.e.,
+    Exx = y, Eyy = 0 and Exy = x, are recovered exactly at all nodes of a
+    coarse mesh, including the boundary nodes linked to one or two elements.
+    """
+
+    job = front2back.BackendJob('Job-1')
+    job.setMesh(50, 2)
+
+    model1, coordinates = main.getModel(job)
+    ndof = model1.getNodeDegreesOfFreedom()
+
+    labels = np.nonzero(ndof[:, 0] >= 0)[0]
+    x, y = coordinates[labels, 0], coordinates[labels, 1]
+
+    displacement = np.zeros(len(model1.ndof))
+    displacement[ndof[labels, 0]] = x*y
+
+    operator = main.getStrainOperator(model1, labels)
+    strains = operator.dot(displacement).reshape((-1, 3))
+
+    assert np.allclose(strains, np.column_stack((y, np.zeros_like(y), x)),
+            rtol=0, atol=1e-12)
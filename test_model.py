@@ -0,0 +1,56 @@
+import numpy as np
+from scipy.sparse import linalg
+
+import main
+import model
+import material
+import quadrature
+import quadrilaterals
+
+
+def getShuffledModel(nel_x, nel_y, numbering, seed=0):
+
+    """
+    Get a model of the beam mesh with the nodes in random order, i.e., of
+    an unstructured numbering, fixed at the bottom of both ends.
+    """
+
+    coordinates, connectivity = main.getMesh(sum(main.spans), main.height,
+            main.height, nel_x, nel_y)
+
+    order = np.random.RandomState(seed).permutation(len(coordinates))
+    coordinates, connectivity = coordinates[order], np.argsort(order)[connectivity]
+
+    mesh = model.Mesh(coordinates)
+    mesh.adof[:, :2] = True
+
+    group = model.ElementGroup(connectivity, quadrilaterals.Quad4(),
+            material.LinearElastic(3e10, 0.3, 2000), 0.1,
+            quadrature.Gauss.inQuadrilateral(rule=2).info)
+
+    model1 = model.Model(mesh, groups=[group])
+    model1.renumber(numbering)
+
+    ends = np.nonzero(np.isclose(coordinates[:, 1], -main.height/2) &
+            np.isin(coordinates[:, 0], [0, sum(main.spans)]))[0]
+    model1.constraints.addFixation(ends, ['x', 'y'])
+
+    return model1
+
+
+def test_rcm_numbering_reduces_fill():
+
+    """
+    For nodes in random order, the RCM numbering reduces the fill-in of the
+    factorization of the stiffness matrix without column ordering by more
+    than an order of magnitude.
+    """
+
+    fill = {}
+
+    for numbering in ['Natural', 'RCM']:
+        stiffness, = model.assemble(getShuffledModel(200, 6, numbering), 'stiffness')
+        factorization = linalg.splu(stiffness.getPartitionFF(), permc_spec='NATURAL')
+        fill[numbering] = factorization.L.nnz+factorization.U.nnz
+
+    assert fill['RCM'] < fill['Natural']/10